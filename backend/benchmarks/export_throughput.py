@@ -0,0 +1,71 @@
+"""Measure /api/export streaming throughput and memory for growing accounts.
+
+Seeds one user per size with journal entries and goals through bulk inserts,
+then drains export_user_rows directly (the ASGI test transport buffers whole
+bodies) and prints rows/sec, output size and the peak Python heap seen while
+streaming, which should stay flat as the account grows.
+
+    python benchmarks/export_throughput.py --sizes 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.sqlite")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+async def seed(user_id, size):
+    today = datetime.now(timezone.utc)
+    async with server.engine.begin() as conn:
+        for offset in range(0, size, 5000):
+            batch = range(offset, min(size, offset + 5000))
+            await conn.execute(server.JournalEntryModel.__table__.insert(), [
+                {"id": str(uuid.uuid4()), "user_id": user_id, "content": f"Entry {i} " * 20, "mood": "happy", "gratitude": ["family"], "date": (today - timedelta(days=i)).date().isoformat(), "created_at": today}
+                for i in batch
+            ])
+            await conn.execute(server.GoalModel.__table__.insert(), [
+                {"id": str(uuid.uuid4()), "user_id": user_id, "title": f"Goal {i}", "description": "", "category": "personal", "principle": "think_and_grow_rich", "why": "",
+                 "milestones": [], "status": "active", "progress": 0, "created_at": today, "updated_at": today}
+                for i in batch
+            ])
+
+
+async def drain(user_id, compress):
+    size = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    async for chunk in server.export_user_rows(user_id, compress):
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+
+async def run(sizes):
+    await server.run_migrations()
+    print(f"{'rows':>8}{'gzip':>6}{'rows/s':>12}{'MB out':>10}{'peak MB':>10}")
+    for size in sizes:
+        user_id = str(uuid.uuid4())
+        await seed(user_id, size)
+        for compress in (False, True):
+            elapsed, out, peak = await drain(user_id, compress)
+            print(f"{size * 2:>8}{'yes' if compress else 'no':>6}{size * 2 / elapsed:>12.0f}{out / 1e6:>10.2f}{peak / 1e6:>10.2f}")
+    await server.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000])
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes))
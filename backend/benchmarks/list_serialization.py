@@ -0,0 +1,82 @@
+"""Compare list response serialization before and after the fast JSON path.
+
+Builds detached journal entry and goal rows and serializes them the old way
+(model_validate per row, FastAPI response_model validation, stdlib json) and
+through dump_json, checks both produce the same document and prints
+throughput for each list size.
+
+    python benchmarks/list_serialization.py --sizes 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.sqlite")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+import server  # noqa: E402
+
+
+def journal_rows(count):
+    now = datetime.now(timezone.utc)
+    return [
+        server.JournalEntryModel(id=str(uuid.uuid4()), user_id="bench", content=f"Entry {i} " * 20, mood="happy", gratitude=["family", "health"], date=now.date().isoformat(), created_at=now)
+        for i in range(count)
+    ]
+
+
+def goal_rows(count):
+    now = datetime.now(timezone.utc)
+    return [
+        server.GoalModel(id=str(uuid.uuid4()), user_id="bench", title=f"Goal {i}", description="bench", category="personal", principle="think_and_grow_rich", why="", target_date=None,
+                         milestones=[{"title": "a", "completed": True}, {"title": "b", "completed": False}], status="active", progress=50, created_at=now, updated_at=now)
+        for i in range(count)
+    ]
+
+
+async def old_path(model, rows):
+    field = create_response_field(name="Response", type_=List[model])
+    content = await serialize_response(field=field, response_content=[model.model_validate(r) for r in rows])
+    return JSONResponse(content).body
+
+
+async def best_of(repeats, fn):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = await fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), body
+
+
+async def run(sizes, repeats):
+    print(f"{'list':<16}{'rows':>8}{'old rows/s':>14}{'new rows/s':>14}{'speedup':>10}")
+    for name, model, build in (("journal", server.JournalEntry, journal_rows), ("goals", server.Goal, goal_rows)):
+        for size in sizes:
+            rows = build(size)
+            old_seconds, old_body = await best_of(repeats, lambda: old_path(model, rows))
+
+            async def new_path():
+                return server.dump_json(List[model], rows)
+            new_seconds, new_body = await best_of(repeats, new_path)
+            assert json.loads(old_body) == json.loads(new_body)
+            print(f"{name:<16}{size:>8}{size / old_seconds:>14.0f}{size / new_seconds:>14.0f}{old_seconds / new_seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeats))
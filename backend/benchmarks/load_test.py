@@ -0,0 +1,256 @@
+"""Drive mixed read/write traffic against the API and report per-route latency.
+
+Seeds --users accounts with benchmarks/seed_data.py, logs each one in, then
+runs --concurrency async workers for --duration seconds. Each request picks a
+user and a weighted operation (list and dashboard reads, search, delta sync,
+habit and rule check-ins, journal posts, goal updates, batched replays). It
+prints throughput and p50/p95/p99 per route and writes the same numbers as
+JSON to --output so runs from different commits can be diffed with --compare.
+
+By default the app runs in-process through httpx's ASGI transport against
+DATABASE_URL (a throwaway local sqlite file unless set, which needs aiosqlite
+from backend/requirements-dev.txt). Pass --base-url to
+load a running server instead; DATABASE_URL must then point at that server's
+database so the seeded users exist there.
+
+    python benchmarks/load_test.py --users 20 --duration 60 --output load.json
+    python benchmarks/load_test.py --output load.json --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("QUERY_BUDGET_MODE", "off")
+
+import httpx  # noqa: E402
+import seed_data  # noqa: E402
+from seed_data import server  # noqa: E402
+
+READ_WEIGHT = 0.8
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Account:
+    def __init__(self, user_id, headers):
+        self.user_id = user_id
+        self.headers = headers
+        self.habit_ids = []
+        self.goal_ids = []
+        self.rule_ids = []
+        self.sync_token = None
+
+
+async def list_goals(client, account, rng):
+    return await client.get("/api/goals", headers=account.headers, params={"limit": 50})
+
+
+async def list_habits(client, account, rng):
+    return await client.get("/api/habits", headers=account.headers, params={"limit": 50})
+
+
+async def list_journal(client, account, rng):
+    return await client.get("/api/journal", headers=account.headers, params={"limit": 50})
+
+
+async def list_identity_statements(client, account, rng):
+    return await client.get("/api/identity/statements", headers=account.headers)
+
+
+async def dashboard(client, account, rng):
+    return await client.get("/api/dashboard", headers=account.headers)
+
+
+async def streaks(client, account, rng):
+    return await client.get("/api/streaks", headers=account.headers)
+
+
+async def search(client, account, rng):
+    return await client.get("/api/search", headers=account.headers, params={"q": " ".join(rng.sample(seed_data.WORDS, 2)), "limit": 20})
+
+
+async def sync(client, account, rng):
+    params = {"since": account.sync_token} if account.sync_token else {}
+    response = await client.get("/api/sync", headers=account.headers, params=params)
+    if response.status_code == 200:
+        account.sync_token = response.json()["token"]
+    return response
+
+
+async def complete_habit(client, account, rng):
+    return await client.post(f"/api/habits/{rng.choice(account.habit_ids)}/complete", headers=account.headers)
+
+
+async def complete_two_minute_rule(client, account, rng):
+    return await client.post(f"/api/two-minute-rule/{rng.choice(account.rule_ids)}/complete", headers=account.headers)
+
+
+async def create_journal_entry(client, account, rng):
+    return await client.post("/api/journal", headers=account.headers, json={"content": seed_data.sentence(rng, 20, 80), "mood": rng.choice(seed_data.MOODS)})
+
+
+async def update_goal(client, account, rng):
+    return await client.put(f"/api/goals/{rng.choice(account.goal_ids)}", headers=account.headers, json={"progress": rng.randint(0, 100)})
+
+
+async def batch(client, account, rng):
+    operations = [
+        {"idempotency_key": str(uuid.uuid4()), "op": "complete_habit", "params": {"habit_id": rng.choice(account.habit_ids)}},
+        {"idempotency_key": str(uuid.uuid4()), "op": "create_journal_entry", "body": {"content": seed_data.sentence(rng, 10, 40)}},
+        {"idempotency_key": str(uuid.uuid4()), "op": "complete_ritual", "body": {"ritual_type": "morning", "completed_at": datetime.now(timezone.utc).isoformat()}},
+    ]
+    return await client.post("/api/batch", headers=account.headers, json={"operations": operations})
+
+
+READS = [(list_goals, 3), (list_habits, 3), (list_journal, 3), (list_identity_statements, 1), (dashboard, 3), (streaks, 1), (search, 1), (sync, 2)]
+WRITES = [(complete_habit, 3), (complete_two_minute_rule, 1), (create_journal_entry, 2), (update_goal, 2), (batch, 1)]
+
+
+def operation_mix(write_ratio):
+    operations, weights = [], []
+    for group, share in ((READS, 1 - write_ratio), (WRITES, write_ratio)):
+        total = sum(weight for _, weight in group)
+        for operation, weight in group:
+            operations.append(operation)
+            weights.append(share * weight / total)
+    return operations, weights
+
+
+async def login(client, user_id, email):
+    response = await client.post("/api/auth/login", json={"email": email, "password": seed_data.PASSWORD})
+    response.raise_for_status()
+    account = Account(user_id, {"Authorization": f"Bearer {response.json()['token']}"})
+    habits = await client.get("/api/habits", headers=account.headers, params={"limit": 100})
+    goals = await client.get("/api/goals", headers=account.headers, params={"limit": 100})
+    rules = await client.get("/api/two-minute-rule", headers=account.headers, params={"limit": 100})
+    account.habit_ids = [h["id"] for h in habits.json()]
+    account.goal_ids = [g["id"] for g in goals.json()]
+    account.rule_ids = [r["id"] for r in rules.json()]
+    return account
+
+
+async def worker(client, accounts, operations, weights, rng, deadline, warmup_until, samples):
+    while time.perf_counter() < deadline:
+        account = rng.choice(accounts)
+        operation = rng.choices(operations, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await operation(client, account, rng)
+            ok = response.status_code < 400
+        except (httpx.HTTPError, IndexError):
+            ok = False
+        elapsed = time.perf_counter() - start
+        if start >= warmup_until:
+            latencies, errors = samples.setdefault(operation.__name__, ([], [0]))
+            latencies.append(elapsed)
+            errors[0] += 0 if ok else 1
+
+
+def summarize(latencies, errors, seconds):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / seconds, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, baseline):
+    print(f"{'route':<28}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}" + (f"{'p95 vs base':>13}{'req/s vs base':>15}" if baseline else ""))
+    rows = sorted(report["routes"].items()) + [("TOTAL", report["total"])]
+    for name, stats in rows:
+        line = f"{name:<28}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>10.1f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        base = None
+        if baseline:
+            base = baseline["total"] if name == "TOTAL" else baseline["routes"].get(name)
+        if base:
+            line += f"{(stats['p95_ms'] / base['p95_ms'] - 1) * 100:>+12.1f}%{(stats['rps'] / base['rps'] - 1) * 100:>+14.1f}%"
+        print(line)
+
+
+async def run(args):
+    seed_start = time.perf_counter()
+    seeded, counts = await seed_data.seed_users(args.users, args.years, args.habits, args.journal, args.seed, unique=args.unique)
+    seed_seconds = time.perf_counter() - seed_start
+
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        transport, base_url = httpx.ASGITransport(app=server.app, raise_app_exceptions=False), "http://load-test"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    samples = {}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=60) as client:
+        accounts = await asyncio.gather(*(login(client, user_id, email) for user_id, email in seeded))
+        operations, weights = operation_mix(args.write_ratio)
+        started = time.perf_counter()
+        warmup_until = started + args.warmup
+        deadline = warmup_until + args.duration
+        await asyncio.gather(*(
+            worker(client, accounts, operations, weights, random.Random(args.seed * 1000 + i), deadline, warmup_until, samples)
+            for i in range(args.concurrency)
+        ))
+        measured = time.perf_counter() - warmup_until
+    await server.engine.dispose()
+
+    all_latencies = [latency for latencies, _ in samples.values() for latency in latencies]
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "target": args.base_url or f"in-process ({server.engine.dialect.name})",
+            "python": platform.python_version(),
+            "args": vars(args),
+        },
+        "seed": {"users": len(seeded), "seconds": round(seed_seconds, 2), "rows": counts},
+        "duration_seconds": round(measured, 2),
+        "total": summarize(all_latencies, sum(errors[0] for _, errors in samples.values()), measured),
+        "routes": {name: summarize(latencies, errors[0], measured) for name, (latencies, errors) in samples.items()},
+    }
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--years", type=float, default=2.0)
+    parser.add_argument("--habits", type=int, default=6)
+    parser.add_argument("--journal", type=int, default=1000, help="journal entries per seeded user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--unique", action="store_true", help="seed users with fresh emails and ids, for a database that was seeded before")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds, after --warmup")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--write-ratio", type=float, default=1 - READ_WEIGHT)
+    parser.add_argument("--base-url", default=None, help="load a running server instead of the in-process app")
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    parser.add_argument("--compare", default=None, help="JSON report from an earlier run to diff against")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,232 @@
+"""Generate synthetic users with realistic history for benchmarks and load tests.
+
+Bulk-inserts each user's goals, habits with years of daily check-ins,
+thousands of journal entries, obstacles, two-minute rules, habit chains,
+identity evidence and mastermind meetings into DATABASE_URL (defaults to a
+throwaway local sqlite file), then fills the search index and rebuilds the
+analytics rollups the way a real account would have them. For a given
+--seed the ids, emails and content are identical on every run, and dates
+are laid out relative to today. Pass --unique to seed the same data again
+into a database that already has it. The sqlite default needs aiosqlite
+from backend/requirements-dev.txt.
+
+    python benchmarks/seed_data.py --users 50 --years 3 --journal 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, time as day_time, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.sqlite")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+PASSWORD = "load-test"
+WORDS = (
+    "today felt focused calm tired grateful progress habit morning walk read wrote family friend work project "
+    "deadline meeting workout run sleep coffee plan goal small win setback patience discipline courage fear "
+    "learned practice journal reflect breathe weekend evening quiet energy stress gym meditation book idea"
+).split()
+MOODS = ("happy", "calm", "grateful", "tired", "anxious", "motivated", None)
+HABIT_NAMES = ("Meditate", "Read 20 pages", "Morning run", "Journal", "Drink water", "Stretch", "No phone after 10pm", "Practice guitar", "Walk", "Plan tomorrow")
+INSERT_CHUNK = 5000
+
+
+def new_id(ids):
+    return str(uuid.UUID(int=ids.getrandbits(128)))
+
+
+def sentence(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+
+def moment(day, rng):
+    return datetime.combine(day, day_time(rng.randint(6, 22), rng.randint(0, 59)), tzinfo=timezone.utc)
+
+
+def user_rows(rng, ids, user_id, today, years, habits, journal):
+    days = max(1, int(years * 365))
+    start = today - timedelta(days=days - 1)
+    rows = {model: [] for model in (
+        server.GoalModel, server.HabitModel, server.HabitCompletionModel, server.JournalEntryModel, server.ObstacleModel,
+        server.TwoMinuteRuleModel, server.TwoMinuteRuleCompletionModel, server.HabitChainModel, server.HabitChainCompletionModel,
+        server.IdentityStatementModel, server.IdentityEvidenceModel, server.MastermindMemberModel, server.MastermindMeetingModel
+    )}
+
+    for i in range(rng.randint(8, 25)):
+        milestones = [{"title": sentence(rng, 2, 5), "completed": rng.random() < 0.5} for _ in range(rng.randint(0, 6))]
+        done = sum(1 for m in milestones if m["completed"])
+        created = moment(start + timedelta(days=rng.randrange(days)), rng)
+        rows[server.GoalModel].append({
+            "id": new_id(ids), "user_id": user_id, "title": sentence(rng, 2, 6), "description": sentence(rng, 5, 20),
+            "category": rng.choice(("personal", "career", "health", "financial", "relationships")), "principle": "think_and_grow_rich",
+            "why": sentence(rng, 5, 15), "target_date": None, "milestones": milestones,
+            "status": "completed" if milestones and done == len(milestones) else "active",
+            "progress": int(done / len(milestones) * 100) if milestones else 0, "created_at": created, "updated_at": created
+        })
+
+    for name in rng.sample(HABIT_NAMES, min(habits, len(HABIT_NAMES))):
+        habit_id = new_id(ids)
+        adherence = rng.uniform(0.5, 0.95)
+        first_day = rng.randrange(days // 3 + 1)
+        created = moment(start + timedelta(days=first_day), rng)
+        rows[server.HabitModel].append({
+            "id": habit_id, "user_id": user_id, "name": name, "description": sentence(rng, 3, 10), "frequency": "daily",
+            "streak": 0, "best_streak": 0, "last_completed": None, "created_at": created, "updated_at": created
+        })
+        rows[server.HabitCompletionModel].extend(
+            {"id": new_id(ids), "habit_id": habit_id, "user_id": user_id, "date": (start + timedelta(days=d)).isoformat(), "created_at": moment(start + timedelta(days=d), rng)}
+            for d in range(first_day, days) if rng.random() < adherence
+        )
+
+    for _ in range(journal):
+        day = start + timedelta(days=rng.randrange(days))
+        created = moment(day, rng)
+        rows[server.JournalEntryModel].append({
+            "id": new_id(ids), "user_id": user_id, "content": sentence(rng, 20, 120), "mood": rng.choice(MOODS),
+            "gratitude": [sentence(rng, 1, 4) for _ in range(rng.randint(0, 3))], "date": day.isoformat(), "created_at": created, "updated_at": created
+        })
+
+    for _ in range(rng.randint(10, 40)):
+        created = moment(start + timedelta(days=rng.randrange(days)), rng)
+        transformed = rng.random() < 0.4
+        rows[server.ObstacleModel].append({
+            "id": new_id(ids), "user_id": user_id, "obstacle_text": sentence(rng, 5, 20),
+            "perception": sentence(rng, 5, 15) if transformed else None, "action": sentence(rng, 5, 15) if transformed else None,
+            "will": sentence(rng, 5, 15) if transformed else None, "status": "transformed" if transformed else "active",
+            "transformed_at": created.isoformat() if transformed else None, "created_at": created, "updated_at": created
+        })
+
+    for _ in range(rng.randint(2, 6)):
+        rule_id = new_id(ids)
+        dates = sorted({(start + timedelta(days=rng.randrange(days))).isoformat() for _ in range(rng.randint(0, 120))})
+        created = moment(start, rng)
+        rows[server.TwoMinuteRuleModel].append({
+            "id": rule_id, "user_id": user_id, "full_habit": sentence(rng, 3, 8), "two_minute_version": sentence(rng, 2, 5),
+            "completion_count": len(dates), "last_completed": dates[-1] if dates else None, "graduation_level": min(5, len(dates) // 7),
+            "created_at": created, "updated_at": created
+        })
+        rows[server.TwoMinuteRuleCompletionModel].extend(
+            {"id": new_id(ids), "rule_id": rule_id, "user_id": user_id, "date": d, "created_at": created} for d in dates
+        )
+
+    for _ in range(rng.randint(1, 4)):
+        chain_id = new_id(ids)
+        outcomes = [rng.random() < 0.7 for _ in range(rng.randint(0, 200))]
+        created = moment(start, rng)
+        rows[server.HabitChainModel].append({
+            "id": chain_id, "user_id": user_id, "name": sentence(rng, 2, 4), "existing_habit": sentence(rng, 2, 5), "new_habit": sentence(rng, 2, 5),
+            "chain_items": [], "success_count": sum(outcomes), "total_attempts": len(outcomes),
+            "chain_strength": sum(outcomes) * 100 // len(outcomes) if outcomes else 0, "created_at": created, "updated_at": created
+        })
+        rows[server.HabitChainCompletionModel].extend(
+            {"id": new_id(ids), "user_id": user_id, "chain_id": chain_id, "success": success, "date": (start + timedelta(days=rng.randrange(days))).isoformat(), "created_at": created}
+            for success in outcomes
+        )
+
+    for _ in range(rng.randint(1, 4)):
+        identity_id = new_id(ids)
+        evidence = [start + timedelta(days=rng.randrange(days)) for _ in range(rng.randint(0, 60))]
+        created = moment(start, rng)
+        rows[server.IdentityStatementModel].append({
+            "id": identity_id, "user_id": user_id, "old_identity": sentence(rng, 3, 8), "new_identity": sentence(rng, 3, 8),
+            "evidence_count": len(evidence), "strength_score": min(100, len(evidence) * 2), "created_at": created, "updated_at": created
+        })
+        for day in evidence:
+            logged = moment(day, rng)
+            rows[server.IdentityEvidenceModel].append({
+                "id": new_id(ids), "user_id": user_id, "identity_id": identity_id, "evidence_text": sentence(rng, 5, 20),
+                "date": day.isoformat(), "created_at": logged, "updated_at": logged
+            })
+
+    member_ids = [new_id(ids) for _ in range(rng.randint(2, 6))]
+    for member_id in member_ids:
+        created = moment(start, rng)
+        rows[server.MastermindMemberModel].append({
+            "id": member_id, "user_id": user_id, "name": sentence(rng, 1, 2), "expertise": sentence(rng, 1, 3),
+            "contribution": sentence(rng, 5, 15), "is_virtual": rng.random() < 0.5, "created_at": created, "updated_at": created
+        })
+    for _ in range(rng.randint(10, 80)):
+        day = start + timedelta(days=rng.randrange(days))
+        created = moment(day, rng)
+        rows[server.MastermindMeetingModel].append({
+            "id": new_id(ids), "user_id": user_id, "member_id": rng.choice(member_ids), "topic": sentence(rng, 3, 8),
+            "insights": sentence(rng, 10, 40), "action_items": [sentence(rng, 2, 6) for _ in range(rng.randint(0, 3))],
+            "date": day.isoformat(), "created_at": created, "updated_at": created
+        })
+    return rows
+
+
+async def insert_rows(db, rows, counts):
+    for model, values in rows.items():
+        for offset in range(0, len(values), INSERT_CHUNK):
+            await db.execute(model.__table__.insert(), values[offset:offset + INSERT_CHUNK])
+        counts[model.__tablename__] = counts.get(model.__tablename__, 0) + len(values)
+
+
+async def index_rows(db, user_id, rows):
+    await server.index_search_documents(db, user_id, "journal", [(r["id"], r["content"]) for r in rows[server.JournalEntryModel]])
+    await server.index_search_documents(db, user_id, "obstacle", [
+        (r["id"], " ".join(part for part in (r["obstacle_text"], r["perception"], r["action"], r["will"]) if part)) for r in rows[server.ObstacleModel]
+    ])
+    await server.index_search_documents(db, user_id, "mastermind", [(r["id"], r["insights"]) for r in rows[server.MastermindMeetingModel]])
+    await server.index_search_documents(db, user_id, "evidence", [(r["id"], r["evidence_text"]) for r in rows[server.IdentityEvidenceModel]])
+
+
+async def seed_users(users, years=2.0, habits=6, journal=1000, seed=1, prefix=None, unique=False):
+    await server.run_migrations()
+    rng = random.Random(seed)
+    prefix = prefix or f"load-{seed}"
+    if unique:
+        prefix = f"{prefix}-{time.time_ns()}"
+    ids = random.Random(prefix)
+    password_hash = await server.hash_password(PASSWORD)
+    today = datetime.now(timezone.utc).date()
+    accounts = []
+    counts = {}
+    for i in range(users):
+        user_id = new_id(ids)
+        email = f"{prefix}-{i}@example.com"
+        rows = user_rows(rng, ids, user_id, today, years, habits, journal)
+        async with server.async_session() as db:
+            await db.execute(server.UserModel.__table__.insert(), [{
+                "id": user_id, "email": email, "name": f"Load User {i}", "password_hash": password_hash,
+                "wisdom_notifications": True, "created_at": datetime.now(timezone.utc)
+            }])
+            await insert_rows(db, rows, counts)
+            await index_rows(db, user_id, rows)
+            await server.refresh_imported_habit_streaks(db, user_id, {r["id"] for r in rows[server.HabitModel]})
+            await db.commit()
+        await server.rebuild_analytics(user_id)
+        accounts.append((user_id, email))
+    return accounts, counts
+
+
+async def run(args):
+    start = time.perf_counter()
+    accounts, counts = await seed_users(args.users, args.years, args.habits, args.journal, args.seed, unique=args.unique)
+    elapsed = time.perf_counter() - start
+    await server.engine.dispose()
+    print(f"Seeded {len(accounts)} users ({sum(counts.values())} rows) in {elapsed:.1f}s into {server.engine.url.render_as_string(hide_password=True)}")
+    for table, count in sorted(counts.items()):
+        print(f"{table:<30}{count:>10}")
+    print(f"Log in as {accounts[0][1]} / {PASSWORD}" if accounts else "")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--years", type=float, default=2.0)
+    parser.add_argument("--habits", type=int, default=6)
+    parser.add_argument("--journal", type=int, default=1000, help="journal entries per user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--unique", action="store_true", help="suffix emails and ids with a timestamp so repeated runs can share a database")
+    asyncio.run(run(parser.parse_args()))
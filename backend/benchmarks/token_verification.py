@@ -0,0 +1,48 @@
+"""Compare cached and uncached bearer token verification.
+
+Calls get_current_user directly with the same token, once with the token
+cache cleared before every call (a full jwt.decode each time) and once with
+the cache warm, and prints the per-call cost of each path.
+
+    python benchmarks/token_verification.py --iterations 100000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.sqlite")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+import server  # noqa: E402
+
+
+async def measure(credentials, iterations, cached):
+    server.token_cache.clear()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            server.token_cache.clear()
+        await server.get_current_user(credentials)
+    return (time.perf_counter() - start) / iterations
+
+
+async def run(iterations):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=server.create_token("bench-user"))
+    uncached = await measure(credentials, iterations, cached=False)
+    cached = await measure(credentials, iterations, cached=True)
+    print(f"{'path':<12}{'us/call':>10}")
+    print(f"{'uncached':<12}{uncached * 1e6:>10.2f}")
+    print(f"{'cached':<12}{cached * 1e6:>10.2f}")
+    print(f"speedup {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
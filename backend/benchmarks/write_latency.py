@@ -0,0 +1,107 @@
+"""Measure latency and SQL round-trips of the create/update write endpoints.
+
+Runs the app in-process through httpx's ASGI transport against DATABASE_URL
+(defaults to a throwaway local sqlite file) twice: once on the refresh path
+the handlers used to take (a locking read of the analytics rollup before the
+write, and a refresh of every written row after commit), then on the current
+path. Prints p50/p95 latency and statements per request for each route on
+both paths.
+
+    python benchmarks/write_latency.py --iterations 300
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.sqlite")
+os.environ.setdefault("QUERY_BUDGET_MODE", "warn")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+import server  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+
+class RefreshingSession(server.AsyncSession):
+    async def commit(self):
+        await super().commit()
+        for obj in list(self.identity_map.values()):
+            await self.refresh(obj)
+
+
+async def locked_rollup_update(db, user_id, **values):
+    await db.execute(select(server.UserAnalyticsModel).where(server.UserAnalyticsModel.user_id == user_id).with_for_update())
+    await current_rollup_update(db, user_id, **values)
+
+
+current_rollup_update = server.update_analytics_rollup
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def timed(client, results, name, method, path, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, path, **kwargs)
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    latencies, queries = results.setdefault(name, ([], []))
+    latencies.append(elapsed)
+    queries.append(int(response.headers.get("x-db-queries", 0)))
+    return response.json()
+
+
+async def run(iterations, refresh_path):
+    server.async_session.class_ = RefreshingSession if refresh_path else server.AsyncSession
+    server.update_analytics_rollup = locked_rollup_update if refresh_path else current_rollup_update
+    transport = httpx.ASGITransport(app=server.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        register = await client.post("/api/auth/register", json={"email": f"bench-{time.time_ns()}@example.com", "password": "bench", "name": "Bench"})
+        headers = {"Authorization": f"Bearer {register.json()['token']}"}
+        for i in range(iterations):
+            goal = await timed(client, results, "create_goal", "POST", "/api/goals", headers=headers, json={"title": f"Goal {i}", "milestones": [{"title": "a", "completed": False}]})
+            await timed(client, results, "update_goal", "PUT", f"/api/goals/{goal['id']}", headers=headers, json={"progress": 50})
+            habit = await timed(client, results, "create_habit", "POST", "/api/habits", headers=headers, json={"name": f"Habit {i}", "description": "bench"})
+            await timed(client, results, "update_habit", "PUT", f"/api/habits/{habit['id']}", headers=headers, json={"description": "updated"})
+            obstacle = await timed(client, results, "create_obstacle", "POST", "/api/obstacles", headers=headers, json={"obstacle_text": "obstacle"})
+            await timed(client, results, "update_obstacle", "PUT", f"/api/obstacles/{obstacle['id']}", headers=headers, json={"perception": "p"})
+            practice = await timed(client, results, "create_premeditatio", "POST", "/api/premeditatio", headers=headers, json={"scenario": "scenario"})
+            await timed(client, results, "update_premeditatio", "PUT", f"/api/premeditatio/{practice['id']}", headers=headers, json={"resilience_score": 7})
+            await timed(client, results, "create_identity_statement", "POST", "/api/identity/statements", headers=headers, json={"old_identity": "old", "new_identity": "new"})
+            await timed(client, results, "create_journal_entry", "POST", "/api/journal", headers=headers, json={"content": "entry"})
+            await timed(client, results, "create_exercise", "POST", "/api/exercises", headers=headers, json={"exercise_type": "bench", "content": {}})
+            await timed(client, results, "complete_habit", "POST", f"/api/habits/{habit['id']}/complete", headers=headers)
+    return results
+
+
+async def main(iterations):
+    await server.run_migrations()
+    before = await run(iterations, refresh_path=True)
+    after = await run(iterations, refresh_path=False)
+    await server.engine.dispose()
+
+    print(f"{'route':<28}{'refresh p50':>12}{'p50 ms':>10}{'refresh p95':>12}{'p95 ms':>10}{'queries':>12}")
+    for name, (latencies, queries) in after.items():
+        old_latencies, old_queries = before[name]
+        print(
+            f"{name:<28}{percentile(old_latencies, 50) * 1000:>12.2f}{percentile(latencies, 50) * 1000:>10.2f}"
+            f"{percentile(old_latencies, 95) * 1000:>12.2f}{percentile(latencies, 95) * 1000:>10.2f}"
+            f"{statistics.mean(old_queries):>6.1f} ->{statistics.mean(queries):>4.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -1,16 +1,37 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import PlainTextResponse, ORJSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Integer, Text, DateTime, Boolean, JSON, select, update, delete, func
+from sqlalchemy import String, Integer, Float, Text, Date, DateTime, Boolean, JSON, UniqueConstraint, Index, select, update, delete, func, inspect, text, column, bindparam, and_, or_, case, event
+from sqlalchemy.exc import IntegrityError, DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
+import time
+import bisect
+import contextvars
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from inspect import signature as inspect_signature
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, TypeAdapter, ValidationError, field_validator
+from typing import List, Optional, Dict, Any, Tuple, Literal, Union, Annotated
 import uuid
+import json
+import base64
+import csv
+import re
+import asyncio
+import hashlib
+import zlib
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 import jwt
 from passlib.context import CryptContext
@@ -22,15 +43,208 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.environ.get('DATABASE_URL', '')
+CHECK_INDEXES_ON_STARTUP = os.environ.get('CHECK_INDEXES_ON_STARTUP', '').lower() in ('1', 'true', 'yes')
+QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', 'off').lower()
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', '5'))
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', '500'))
+
 if DATABASE_URL.startswith('postgres://'):
     DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql+asyncpg://', 1)
 elif DATABASE_URL.startswith('postgresql://'):
     DATABASE_URL = DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://', 1)
 
-if 'sslmode=' in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.split('?')[0]
+pool_stats = {"checkouts": 0, "checkout_wait_seconds": 0.0, "checkout_wait_max_seconds": 0.0, "timeouts": 0}
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_stats["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_stats["checkouts"] += 1
+            pool_stats["checkout_wait_seconds"] += waited
+            pool_stats["checkout_wait_max_seconds"] = max(pool_stats["checkout_wait_max_seconds"], waited)
+
+def build_engine(database_url: str):
+    url = make_url(database_url)
+    if url.get_backend_name() != 'postgresql':
+        return create_async_engine(url, echo=False)
+
+    connect_args = {"statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+    sslmode = url.query.get('sslmode')
+    if sslmode:
+        connect_args["ssl"] = sslmode
+    url = url.difference_update_query(['sslmode']).update_query_dict({'prepared_statement_cache_size': str(DB_STATEMENT_CACHE_SIZE)})
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+
+engine = build_engine(DATABASE_URL)
+
+REQUEST_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.label_names = label_names
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, label_values: Tuple[str, ...] = (), amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def lines(self) -> List[str]:
+        lines = [f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, buckets: Tuple[float, ...], label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.buckets = buckets
+        self.label_names = label_names
+        self.series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, label_values: Tuple[str, ...], value: float):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def lines(self) -> List[str]:
+        lines = [f"# TYPE {self.name} histogram"]
+        for label_values, (bucket_counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.label_names, label_values, 'le="%g"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            inf_labels = _format_labels(self.label_names, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {count}")
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+http_request_duration = Histogram("http_request_duration_seconds", REQUEST_LATENCY_BUCKETS, ("method", "route"))
+http_responses = Counter("http_responses_total", ("method", "route", "status"))
+http_requests_in_flight = {"value": 0}
+db_queries_per_request = Histogram("db_queries_per_request", QUERY_COUNT_BUCKETS, ("method", "route"))
+db_seconds_per_request = Histogram("db_seconds_per_request", REQUEST_LATENCY_BUCKETS, ("method", "route"))
+db_queries_total = Counter("db_queries_total")
+export_rows = Counter("export_rows_total", ("table",))
+sync_rows = Counter("sync_rows_total", ("mode",))
+batch_operations = Counter("batch_operations_total", ("outcome",))
+events_published = Counter("events_published_total", ("type",))
+events_dropped = Counter("events_dropped_total")
+response_cache_lookups = Counter("response_cache_lookups_total", ("resource", "result"))
+response_not_modified = Counter("response_not_modified_total", ("resource",))
+response_cache_invalidations = Counter("response_cache_invalidations_total", ("resource",))
+db_query_seconds_total = Counter("db_query_seconds_total")
+request_db_stats: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("request_db_stats", default=None)
+pending_invalidations: contextvars.ContextVar[Optional[set]] = contextvars.ContextVar("pending_invalidations", default=None)
+pending_events: contextvars.ContextVar[Optional[List[Tuple[str, Dict[str, Any]]]]] = contextvars.ContextVar("pending_events", default=None)
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+def query_budget(queries: int, commits: int = 0):
+    def decorator(endpoint):
+        endpoint.query_budget = (queries, commits)
+        return endpoint
+    return decorator
+
+def exempt_from_query_budget():
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats["exempt"] = True
+
+def _check_query_budget(stats: Dict[str, Any], statement: Optional[str] = None):
+    if stats.get("exempt"):
+        return
+    scope = stats["scope"]
+    endpoint = scope.get("endpoint")
+    budget = getattr(endpoint, "query_budget", None)
+    route = scope.get("route")
+    where = f"{scope['method']} {route.path if route is not None else scope['path']}"
+    problems = []
+    if budget is None:
+        if endpoint is not None and not stats.get("reported_missing"):
+            stats["reported_missing"] = True
+            logger.warning(f"No query budget declared for {where}")
+    else:
+        max_queries, max_commits = budget
+        if stats["queries"] > max_queries:
+            problems.append(f"{stats['queries']} queries (budget {max_queries})")
+        if stats["commits"] > max_commits:
+            problems.append(f"{stats['commits']} commits (budget {max_commits})")
+    if statement is not None:
+        repeats = stats["statements"][statement] = stats["statements"].get(statement, 0) + 1
+        if repeats == N_PLUS_ONE_THRESHOLD:
+            problems.append(f"possible N+1: statement ran {repeats} times: {statement[:200]}")
+    if problems:
+        message = f"Query budget exceeded for {where}: " + "; ".join(problems)
+        if QUERY_BUDGET_MODE == "enforce":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_queries_total.inc()
+    db_query_seconds_total.inc(amount=elapsed)
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["db_seconds"] += elapsed
+        if QUERY_BUDGET_MODE != "off":
+            _check_query_budget(stats, statement)
+
+@event.listens_for(engine.sync_engine, "commit")
+def _on_commit(conn):
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats["commits"] += 1
+        if QUERY_BUDGET_MODE != "off":
+            _check_query_budget(stats)
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_query_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection is not None else None
+    if starts:
+        starts.pop()
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 class Base(DeclarativeBase):
@@ -47,8 +261,12 @@ class UserModel(Base):
 
 class GoalModel(Base):
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_user_created", "user_id", "created_at"),
+        Index("ix_goals_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     description: Mapped[str] = mapped_column(Text, default="")
     category: Mapped[str] = mapped_column(String(50), default="personal")
@@ -59,88 +277,143 @@ class GoalModel(Base):
     status: Mapped[str] = mapped_column(String(20), default="active")
     progress: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class HabitModel(Base):
     __tablename__ = "habits"
+    __table_args__ = (
+        Index("ix_habits_user_created", "user_id", "created_at"),
+        Index("ix_habits_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, default="")
     frequency: Mapped[str] = mapped_column(String(20), default="daily")
     streak: Mapped[int] = mapped_column(Integer, default=0)
     best_streak: Mapped[int] = mapped_column(Integer, default=0)
     last_completed: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
-    completion_dates: Mapped[List] = mapped_column(JSON, default=list)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+class HabitCompletionModel(Base):
+    __tablename__ = "habit_completions"
+    __table_args__ = (
+        UniqueConstraint("habit_id", "date", name="uq_habit_completions_habit_date"),
+        Index("ix_habit_completions_user_date", "user_id", "date"),
+    )
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    habit_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    date: Mapped[str] = mapped_column(String(20), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
 class VisionBoardItemModel(Base):
     __tablename__ = "vision_board_items"
+    __table_args__ = (
+        Index("ix_vision_board_items_user_created", "user_id", "created_at"),
+        Index("ix_vision_board_items_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     type: Mapped[str] = mapped_column(String(20), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     position: Mapped[Optional[Dict]] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class JournalEntryModel(Base):
     __tablename__ = "journal_entries"
+    __table_args__ = (
+        Index("ix_journal_entries_user_date", "user_id", "date"),
+        Index("ix_journal_entries_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     mood: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     gratitude: Mapped[List] = mapped_column(JSON, default=list)
     date: Mapped[str] = mapped_column(String(20), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class ExerciseModel(Base):
     __tablename__ = "exercises"
+    __table_args__ = (
+        Index("ix_exercises_user_date", "user_id", "date"),
+        Index("ix_exercises_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     exercise_type: Mapped[str] = mapped_column(String(50), nullable=False)
     content: Mapped[Dict] = mapped_column(JSON, nullable=False)
     completed: Mapped[bool] = mapped_column(Boolean, default=False)
     date: Mapped[str] = mapped_column(String(20), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class RitualCompletionModel(Base):
     __tablename__ = "ritual_completions"
+    __table_args__ = (
+        Index("ix_ritual_completions_user_completed", "user_id", "completed_at"),
+        Index("ix_ritual_completions_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     ritual_type: Mapped[str] = mapped_column(String(50), nullable=False)
     completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class WisdomFavoriteModel(Base):
     __tablename__ = "wisdom_favorites"
+    __table_args__ = (
+        UniqueConstraint("user_id", "quote_id", name="uq_wisdom_favorites_user_quote"),
+        Index("ix_wisdom_favorites_user_created", "user_id", "created_at"),
+        Index("ix_wisdom_favorites_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     quote_id: Mapped[str] = mapped_column(String(100), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class IdentityStatementModel(Base):
     __tablename__ = "identity_statements"
+    __table_args__ = (
+        Index("ix_identity_statements_user_created", "user_id", "created_at"),
+        Index("ix_identity_statements_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     old_identity: Mapped[str] = mapped_column(Text, nullable=False)
     new_identity: Mapped[str] = mapped_column(Text, nullable=False)
     evidence_count: Mapped[int] = mapped_column(Integer, default=0)
     strength_score: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class IdentityEvidenceModel(Base):
     __tablename__ = "identity_evidence"
+    __table_args__ = (
+        Index("ix_identity_evidence_user_identity_created", "user_id", "identity_id", "created_at"),
+        Index("ix_identity_evidence_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
-    identity_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    identity_id: Mapped[str] = mapped_column(String(36), nullable=False)
     evidence_text: Mapped[str] = mapped_column(Text, nullable=False)
     date: Mapped[str] = mapped_column(String(20), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class ObstacleModel(Base):
     __tablename__ = "obstacles"
+    __table_args__ = (
+        Index("ix_obstacles_user_created", "user_id", "created_at"),
+        Index("ix_obstacles_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     obstacle_text: Mapped[str] = mapped_column(Text, nullable=False)
     perception: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     action: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -148,7 +421,7 @@ class ObstacleModel(Base):
     status: Mapped[str] = mapped_column(String(20), default="active")
     transformed_at: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class BurningDesireModel(Base):
     __tablename__ = "burning_desires"
@@ -159,23 +432,32 @@ class BurningDesireModel(Base):
     vision_text: Mapped[str] = mapped_column(Text, nullable=False)
     intensity: Mapped[int] = mapped_column(Integer, default=10)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class DesireVisualizationModel(Base):
     __tablename__ = "desire_visualizations"
+    __table_args__ = (
+        Index("ix_desire_visualizations_user_created", "user_id", "created_at"),
+        Index("ix_desire_visualizations_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     desire_id: Mapped[str] = mapped_column(String(36), nullable=False)
     intensity_rating: Mapped[int] = mapped_column(Integer, nullable=False)
     emotion: Mapped[str] = mapped_column(String(50), nullable=False)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     date: Mapped[str] = mapped_column(String(20), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class PremeditatioPracticeModel(Base):
     __tablename__ = "premeditatio_practices"
+    __table_args__ = (
+        Index("ix_premeditatio_practices_user_created", "user_id", "created_at"),
+        Index("ix_premeditatio_practices_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     scenario: Mapped[str] = mapped_column(Text, nullable=False)
     potential_obstacles: Mapped[List] = mapped_column(JSON, default=list)
     planned_responses: Mapped[List] = mapped_column(JSON, default=list)
@@ -184,12 +466,16 @@ class PremeditatioPracticeModel(Base):
     lessons_learned: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     date: Mapped[str] = mapped_column(String(20), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class HabitChainModel(Base):
     __tablename__ = "habit_chains"
+    __table_args__ = (
+        Index("ix_habit_chains_user_created", "user_id", "created_at"),
+        Index("ix_habit_chains_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     existing_habit: Mapped[str] = mapped_column(Text, nullable=False)
     new_habit: Mapped[str] = mapped_column(Text, nullable=False)
@@ -198,12 +484,15 @@ class HabitChainModel(Base):
     total_attempts: Mapped[int] = mapped_column(Integer, default=0)
     chain_strength: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class HabitChainCompletionModel(Base):
     __tablename__ = "habit_chain_completions"
+    __table_args__ = (
+        Index("ix_habit_chain_completions_user_chain_date", "user_id", "chain_id", "date"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     chain_id: Mapped[str] = mapped_column(String(36), nullable=False)
     success: Mapped[bool] = mapped_column(Boolean, nullable=False)
     date: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -211,44 +500,145 @@ class HabitChainCompletionModel(Base):
 
 class TwoMinuteRuleModel(Base):
     __tablename__ = "two_minute_rules"
+    __table_args__ = (
+        Index("ix_two_minute_rules_user_created", "user_id", "created_at"),
+        Index("ix_two_minute_rules_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     full_habit: Mapped[str] = mapped_column(Text, nullable=False)
     two_minute_version: Mapped[str] = mapped_column(Text, nullable=False)
-    completion_dates: Mapped[List] = mapped_column(JSON, default=list)
+    completion_count: Mapped[int] = mapped_column(Integer, default=0)
+    last_completed: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     graduation_level: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+class TwoMinuteRuleCompletionModel(Base):
+    __tablename__ = "two_minute_rule_completions"
+    __table_args__ = (
+        UniqueConstraint("rule_id", "date", name="uq_two_minute_rule_completions_rule_date"),
+        Index("ix_two_minute_rule_completions_user_date", "user_id", "date"),
+    )
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    rule_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    date: Mapped[str] = mapped_column(String(20), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
 class MastermindMemberModel(Base):
     __tablename__ = "mastermind_members"
+    __table_args__ = (
+        Index("ix_mastermind_members_user_created", "user_id", "created_at"),
+        Index("ix_mastermind_members_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     expertise: Mapped[str] = mapped_column(String(255), nullable=False)
     contribution: Mapped[str] = mapped_column(Text, nullable=False)
     is_virtual: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 class MastermindMeetingModel(Base):
     __tablename__ = "mastermind_meetings"
+    __table_args__ = (
+        Index("ix_mastermind_meetings_user_created", "user_id", "created_at"),
+        Index("ix_mastermind_meetings_user_date", "user_id", "date"),
+        Index("ix_mastermind_meetings_user_updated", "user_id", "updated_at"),
+    )
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
     member_id: Mapped[str] = mapped_column(String(36), nullable=False)
     topic: Mapped[str] = mapped_column(Text, nullable=False)
     insights: Mapped[str] = mapped_column(Text, nullable=False)
     action_items: Mapped[List] = mapped_column(JSON, default=list)
     date: Mapped[str] = mapped_column(String(20), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
-app = FastAPI()
-api_router = APIRouter(prefix="/api")
+class SchemaMigrationModel(Base):
+    __tablename__ = "schema_migrations"
+    version: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class RevokedTokenModel(Base):
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_revoked_at", "revoked_at"),
+    )
+    token_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class TombstoneModel(Base):
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_user_deleted", "user_id", "deleted_at"),
+    )
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    entity: Mapped[str] = mapped_column(String(50), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class IdempotencyKeyModel(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_created", "created_at"),
+    )
+    user_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    op: Mapped[str] = mapped_column(String(100), nullable=False)
+    result: Mapped[Any] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class UserAnalyticsModel(Base):
+    __tablename__ = "user_analytics"
+    user_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    goals_total: Mapped[int] = mapped_column(Integer, default=0)
+    goals_active: Mapped[int] = mapped_column(Integer, default=0)
+    goals_completed: Mapped[int] = mapped_column(Integer, default=0)
+    goals_by_category: Mapped[Dict] = mapped_column(JSON, default=dict)
+    habits_total: Mapped[int] = mapped_column(Integer, default=0)
+    habits_streak_sum: Mapped[int] = mapped_column(Integer, default=0)
+    habits_max_streak: Mapped[int] = mapped_column(Integer, default=0)
+    habits_best_streak: Mapped[int] = mapped_column(Integer, default=0)
+    habit_completions_total: Mapped[int] = mapped_column(Integer, default=0)
+    journal_total: Mapped[int] = mapped_column(Integer, default=0)
+    journal_streak: Mapped[int] = mapped_column(Integer, default=0)
+    journal_last_date: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    mood_distribution: Mapped[Dict] = mapped_column(JSON, default=dict)
+    exercises_total: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+app = FastAPI()
+api_router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '64'))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+password_hash_stats = {"pending": 0, "completed": 0, "failed": 0, "rejected": 0, "rehashed": 0}
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_DAYS = 30
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '10000'))
+TOKEN_REVOCATION_STORE = os.environ.get('TOKEN_REVOCATION_STORE', 'database').lower()
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.environ.get('TOKEN_REVOCATION_SYNC_SECONDS', '5'))
 
 
 class UserCreate(BaseModel):
@@ -371,7 +761,7 @@ class Exercise(BaseModel):
 
 class RitualCompleteRequest(BaseModel):
     ritual_type: str
-    completed_at: str
+    completed_at: datetime
 
 class WisdomFavoriteCreate(BaseModel):
     quote_id: str
@@ -533,36 +923,1058 @@ class MastermindMeetingCreate(BaseModel):
     insights: str
     action_items: List[str] = []
 
+class ImportRowBase(BaseModel):
+    date: str
+
+    @field_validator("date")
+    @classmethod
+    def check_date(cls, value: str) -> str:
+        return datetime.strptime(value.strip(), "%Y-%m-%d").date().isoformat()
+
+class ImportJournalRow(ImportRowBase):
+    kind: Literal["journal"]
+    content: str
+    mood: Optional[str] = None
+    gratitude: List[str] = []
+
+class ImportHabitRow(ImportRowBase):
+    kind: Literal["habit"]
+    name: str = Field(min_length=1)
+    description: str = ""
+    frequency: str = "daily"
+
+ImportRow = Annotated[Union[ImportJournalRow, ImportHabitRow], Field(discriminator="kind")]
+
+BATCH_MAX_OPERATIONS = int(os.environ.get('BATCH_MAX_OPERATIONS', '100'))
+
+class BatchOperation(BaseModel):
+    idempotency_key: str = Field(min_length=1, max_length=100)
+    op: str
+    params: Dict[str, str] = {}
+    body: Optional[Dict[str, Any]] = None
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(min_length=1, max_length=BATCH_MAX_OPERATIONS)
+
+
+async def run_password_task(fn, *args):
+    if password_hash_stats["pending"] >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        password_hash_stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Authentication is busy, please retry")
+    password_hash_stats["pending"] += 1
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(password_executor, fn, *args)
+    except Exception:
+        password_hash_stats["failed"] += 1
+        raise
+    finally:
+        password_hash_stats["pending"] -= 1
+    password_hash_stats["completed"] += 1
+    return result
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await run_password_task(pwd_context.hash, password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await run_password_task(pwd_context.verify_and_update, plain_password, hashed_password)
+
+def password_hash_queue_depth() -> int:
+    return max(0, password_hash_stats["pending"] - PASSWORD_HASH_WORKERS)
 
 def create_token(user_id: str) -> str:
     expiration = datetime.now(timezone.utc) + timedelta(days=JWT_EXPIRATION_DAYS)
-    return jwt.encode({"user_id": user_id, "exp": expiration}, JWT_SECRET, algorithm=JWT_ALGORITHM)
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    return jwt.encode({"user_id": user_id, "exp": expiration, "jti": uuid.uuid4().hex}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class TokenCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str, now: float) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= now:
+            if entry is not None:
+                del self.entries[key]
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def put(self, key: str, user_id: str, expires_at: float):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = (user_id, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def discard(self, key: str):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+revoked_tokens: Dict[str, float] = {}
+revocation_sync_state = {"last_revoked_at": None, "task": None}
+
+def mark_token_revoked(key: str, expires_at: float):
+    revoked_tokens[key] = expires_at
+    token_cache.discard(key)
+
+def prune_revoked_tokens(now: float):
+    for key in [k for k, expires_at in revoked_tokens.items() if expires_at <= now]:
+        del revoked_tokens[key]
+
+def decode_token(token: str) -> Tuple[str, float]:
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    user_id = payload.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user_id, float(payload["exp"])
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    key = token_hash(credentials.credentials)
+    if key in revoked_tokens:
+        raise HTTPException(status_code=401, detail="Token revoked")
+    user_id = token_cache.get(key, time.time())
+    if user_id is not None:
+        return user_id
+    user_id, expires_at = decode_token(credentials.credentials)
+    token_cache.put(key, user_id, expires_at)
+    return user_id
+
+async def sync_revoked_tokens():
+    now = datetime.now(timezone.utc)
+    async with async_session() as session:
+        query = select(RevokedTokenModel.token_hash, RevokedTokenModel.expires_at, RevokedTokenModel.revoked_at).where(RevokedTokenModel.expires_at > now)
+        if revocation_sync_state["last_revoked_at"] is not None:
+            query = query.where(RevokedTokenModel.revoked_at >= revocation_sync_state["last_revoked_at"])
+        rows = (await session.execute(query)).all()
+    for key, expires_at, revoked_at in rows:
+        mark_token_revoked(key, expires_at.replace(tzinfo=expires_at.tzinfo or timezone.utc).timestamp())
+        if revocation_sync_state["last_revoked_at"] is None or revoked_at > revocation_sync_state["last_revoked_at"]:
+            revocation_sync_state["last_revoked_at"] = revoked_at
+    prune_revoked_tokens(time.time())
+
+async def revocation_sync_loop():
+    while True:
+        await asyncio.sleep(TOKEN_REVOCATION_SYNC_SECONDS)
+        try:
+            await sync_revoked_tokens()
+        except Exception:
+            logger.exception("Failed to sync revoked tokens")
 
 async def get_db():
     async with async_session() as session:
         yield session
 
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '500'))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class PageParams:
+    def __init__(self, cursor: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)):
+        self.cursor = cursor
+        self.limit = limit
+
+def encode_cursor(sort_value, row_id: str) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_col) -> Tuple[Any, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        if isinstance(sort_col.type, DateTime):
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def fetch_page(db: AsyncSession, query, sort_col, id_col, page: PageParams, response: Response, descending: bool = True) -> List[Any]:
+    if page.cursor:
+        sort_value, row_id = decode_cursor(page.cursor, sort_col)
+        if descending:
+            query = query.where(or_(sort_col < sort_value, and_(sort_col == sort_value, id_col < row_id)))
+        else:
+            query = query.where(or_(sort_col > sort_value, and_(sort_col == sort_value, id_col > row_id)))
+    if descending:
+        query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(sort_col.asc(), id_col.asc())
+
+    result = await db.execute(query.limit(page.limit + 1))
+    rows = list(result.scalars().all())
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+    return rows
+
+def filter_date_range(query, date_col, date_from: Optional[str], date_to: Optional[str]):
+    if date_from:
+        query = query.where(date_col >= date_from)
+    if date_to:
+        query = query.where(date_col <= date_to)
+    return query
+
+type_adapters: Dict[Any, TypeAdapter] = {}
+
+def type_adapter(model_type) -> TypeAdapter:
+    adapter = type_adapters.get(model_type)
+    if adapter is None:
+        adapter = type_adapters[model_type] = TypeAdapter(model_type)
+    return adapter
+
+def dump_json(model_type, value) -> bytes:
+    adapter = type_adapter(model_type)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+def json_response(model_type, value, response: Optional[Response] = None) -> Response:
+    return Response(content=dump_json(model_type, value), media_type="application/json", headers=response.headers if response is not None else None)
+
+
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory').lower()
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '4096'))
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', '300'))
+RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL', 'redis://localhost:6379/0')
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', '1'))
+
+class MemoryResponseCache:
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[float, str, bytes]]" = OrderedDict()
+        self.generations: "OrderedDict[str, int]" = OrderedDict()
+        self.clock = 0
+        self.evicted_generation = 0
+
+    def generation(self, key: str) -> int:
+        return self.generations.get(key, self.evicted_generation)
+
+    async def get(self, key: str) -> Tuple[Optional[Tuple[str, bytes]], int]:
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            return None, self.generation(key)
+        self.entries.move_to_end(key)
+        return (entry[1], entry[2]), self.generation(key)
+
+    async def set(self, key: str, etag: str, body: bytes, generation: int) -> bool:
+        if self.generation(key) != generation:
+            return False
+        self.entries[key] = (time.monotonic() + self.ttl, etag, body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return True
+
+    async def invalidate(self, key: str):
+        self.entries.pop(key, None)
+        self.clock += 1
+        self.generations[key] = self.clock
+        self.generations.move_to_end(key)
+        # Generations are bumped in order, so the oldest one is the largest ever
+        # evicted; keys without a generation report it, which makes a store
+        # that raced an evicted invalidation miss instead of going stale.
+        while len(self.generations) > self.max_entries:
+            _, self.evicted_generation = self.generations.popitem(last=False)
+
+REDIS_STORE_IF_GENERATION = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+class RedisResponseCache:
+    def __init__(self, url: str, ttl: int):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package (pip install -r requirements-redis.txt)")
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+        self.store = self.client.register_script(REDIS_STORE_IF_GENERATION)
+
+    def generation_key(self, key: str) -> str:
+        return f"{key}:generation"
+
+    async def get(self, key: str) -> Tuple[Optional[Tuple[str, bytes]], int]:
+        raw, generation = await self.client.mget(key, self.generation_key(key))
+        generation = int(generation or 0)
+        if raw is None:
+            return None, generation
+        etag, body = raw.split(b"\n", 1)
+        return (etag.decode(), body), generation
+
+    async def set(self, key: str, etag: str, body: bytes, generation: int) -> bool:
+        stored = await self.store(keys=[key, self.generation_key(key)], args=[generation, etag.encode() + b"\n" + body, self.ttl])
+        return bool(stored)
+
+    async def invalidate(self, key: str):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.incr(self.generation_key(key))
+            pipe.expire(self.generation_key(key), self.ttl)
+            await pipe.execute()
+
+def build_response_cache():
+    if RESPONSE_CACHE_BACKEND == "off":
+        return None
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return RedisResponseCache(RESPONSE_CACHE_URL, RESPONSE_CACHE_TTL)
+    if WEB_CONCURRENCY > 1:
+        raise RuntimeError(f"RESPONSE_CACHE_BACKEND=memory cannot be shared by {WEB_CONCURRENCY} workers; set RESPONSE_CACHE_BACKEND=redis or off")
+    return MemoryResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+response_cache = build_response_cache()
+
+def response_cache_key(user_id: str, resource: str) -> str:
+    return f"response:{user_id}:{resource}"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def cached_json_response(request: Request, resource: str, etag: str, body: bytes) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_not_modified.inc((resource,))
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def get_cached_response(request: Request, user_id: str, resource: str) -> Optional[Response]:
+    if response_cache is None:
+        return None
+    entry, request.state.response_cache_generation = await response_cache.get(response_cache_key(user_id, resource))
+    response_cache_lookups.inc((resource, "miss" if entry is None else "hit"))
+    if entry is None:
+        return None
+    return cached_json_response(request, resource, *entry)
+
+async def cache_response(request: Request, user_id: str, resource: str, body: bytes) -> Response:
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    generation = getattr(request.state, "response_cache_generation", None)
+    if response_cache is not None and generation is not None:
+        await response_cache.set(response_cache_key(user_id, resource), etag, body, generation)
+    return cached_json_response(request, resource, etag, body)
+
+async def invalidate_cached_response(user_id: str, resource: str):
+    pending = pending_invalidations.get()
+    if pending is not None:
+        pending.add((user_id, resource))
+        return
+    if response_cache is not None:
+        await response_cache.invalidate(response_cache_key(user_id, resource))
+        response_cache_invalidations.inc((resource,))
+
+
+EVENT_BACKEND = os.environ.get('EVENT_BACKEND', 'memory').lower()
+EVENT_BACKEND_URL = os.environ.get('EVENT_BACKEND_URL', RESPONSE_CACHE_URL)
+EVENT_CHANNEL = os.environ.get('EVENT_CHANNEL', 'growth:events')
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', '100'))
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_HEARTBEAT_SECONDS', '15'))
+EVENT_TOKEN_TTL_SECONDS = int(os.environ.get('EVENT_TOKEN_TTL_SECONDS', '60'))
+RESYNC_EVENT = {"type": "resync"}
+
+class EventHub:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers: Dict[str, set] = {}
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self.subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[user_id]
+
+    def dispatch(self, user_id: str, event: Dict[str, Any]):
+        for queue in self.subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                events_dropped.inc((), queue.qsize())
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self.subscribers.values())
+
+class MemoryEventBackend:
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, user_id: str, event: Dict[str, Any]):
+        self.hub.dispatch(user_id, event)
+
+class RedisEventBackend:
+    def __init__(self, hub: EventHub, url: str, channel: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("EVENT_BACKEND=redis requires the redis package (pip install -r requirements-redis.txt)")
+        self.hub = hub
+        self.client = redis.from_url(url)
+        self.channel = channel
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.task = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    async def listen(self):
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            payload = orjson.loads(message["data"])
+                            self.hub.dispatch(payload["user_id"], payload["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event subscription to {self.channel} failed, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+    async def publish(self, user_id: str, event: Dict[str, Any]):
+        await self.client.publish(self.channel, orjson.dumps({"user_id": user_id, "event": event}))
+
+def build_event_backend(hub: EventHub):
+    if EVENT_BACKEND == "redis":
+        return RedisEventBackend(hub, EVENT_BACKEND_URL, EVENT_CHANNEL)
+    return MemoryEventBackend(hub)
+
+event_hub = EventHub(EVENT_QUEUE_SIZE)
+event_backend = build_event_backend(event_hub)
+
+async def publish_event(user_id: str, event_type: str, **data):
+    event = {"type": event_type, **data}
+    pending = pending_events.get()
+    if pending is not None:
+        pending.append((user_id, event))
+        return
+    try:
+        await event_backend.publish(user_id, event)
+        events_published.inc((event_type,))
+    except Exception as e:
+        logger.warning(f"Failed to publish {event_type} event: {e}")
+
+async def event_stream(user_id: str):
+    queue = event_hub.subscribe(user_id)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), EVENT_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+    finally:
+        event_hub.unsubscribe(user_id, queue)
+
+def create_event_token(user_id: str) -> str:
+    expiration = datetime.now(timezone.utc) + timedelta(seconds=EVENT_TOKEN_TTL_SECONDS)
+    return jwt.encode({"sub": user_id, "scope": "events", "exp": expiration}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def decode_event_token(token: str) -> str:
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("scope") != "events" or not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload["sub"]
+
+async def get_event_stream_user(token: Optional[str] = None, credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)) -> str:
+    if token is not None:
+        return decode_event_token(token)
+    if credentials is None:
+        raise HTTPException(status_code=403, detail="Not authenticated")
+    return await get_current_user(credentials)
+
+@api_router.post("/events/token")
+@query_budget(queries=0, commits=0)
+async def issue_event_token(user_id: str = Depends(get_current_user)):
+    return {"token": create_event_token(user_id), "expires_in": EVENT_TOKEN_TTL_SECONDS}
+
+@api_router.get("/events")
+@query_budget(queries=0, commits=0)
+async def stream_events(user_id: str = Depends(get_event_stream_user)):
+    return StreamingResponse(
+        event_stream(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+ANALYTICS_RECENT_DAYS = 7
+
+def new_analytics_rollup(user_id: str) -> UserAnalyticsModel:
+    return UserAnalyticsModel(
+        user_id=user_id,
+        goals_total=0,
+        goals_active=0,
+        goals_completed=0,
+        goals_by_category={},
+        habits_total=0,
+        habits_streak_sum=0,
+        habits_max_streak=0,
+        habits_best_streak=0,
+        habit_completions_total=0,
+        journal_total=0,
+        journal_streak=0,
+        journal_last_date=None,
+        mood_distribution={},
+        exercises_total=0
+    )
+
+def _recent_window(today) -> List[str]:
+    return [(today - timedelta(days=i)).isoformat() for i in range(ANALYTICS_RECENT_DAYS)]
+
+class day_number(FunctionElement):
+    type = Integer()
+    inherit_cache = True
+
+@compiles(day_number)
+def _day_number_sqlite(element, compiler, **kw):
+    return "CAST(julianday(%s) AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+@compiles(day_number, "postgresql")
+def _day_number_postgresql(element, compiler, **kw):
+    return "(CAST(%s AS DATE) - DATE '1970-01-01')" % compiler.process(element.clauses, **kw)
+
+class json_count_add(FunctionElement):
+    # json_count_add(doc, key, delta, ...) adds each delta to doc[key]; subclasses with fields take one delta per field.
+    type = JSON()
+    inherit_cache = True
+    fields: Tuple[str, ...] = ()
+
+class category_count_add(json_count_add):
+    inherit_cache = True
+    fields = ("total", "completed")
+
+def _json_count_entries(element, compiler, kw):
+    doc, *args = [compiler.process(clause, **kw) for clause in element.clauses]
+    width = len(element.fields) or 1
+    return doc, [(args[i], args[i + 1:i + 1 + width]) for i in range(0, len(args), width + 1)]
+
+@compiles(json_count_add)
+def _json_count_add_sqlite(element, compiler, **kw):
+    doc, entries = _json_count_entries(element, compiler, kw)
+    values = []
+    for key, deltas in entries:
+        current = f"(SELECT value FROM json_each({doc}) WHERE key = {key})"
+        if element.fields:
+            value = "json_object(%s)" % ", ".join(
+                f"'{field}', COALESCE(json_extract({current}, '$.{field}'), 0) + {delta}" for field, delta in zip(element.fields, deltas)
+            )
+        else:
+            value = f"COALESCE({current}, 0) + {deltas[0]}"
+        values.append(f"{key}, {value}")
+    return f"json_patch(COALESCE({doc}, '{{}}'), json_object({', '.join(values)}))"
+
+@compiles(json_count_add, "postgresql")
+def _json_count_add_postgresql(element, compiler, **kw):
+    doc, entries = _json_count_entries(element, compiler, kw)
+    doc = f"CAST({doc} AS JSONB)"
+    values = []
+    for key, deltas in entries:
+        key = f"CAST({key} AS TEXT)"
+        if element.fields:
+            value = "jsonb_build_object(%s)" % ", ".join(
+                f"'{field}', COALESCE(CAST({doc} -> {key} ->> '{field}' AS INTEGER), 0) + CAST({delta} AS INTEGER)" for field, delta in zip(element.fields, deltas)
+            )
+        else:
+            value = f"COALESCE(CAST({doc} ->> {key} AS INTEGER), 0) + CAST({deltas[0]} AS INTEGER)"
+        values.append(f"{key}, {value}")
+    return f"CAST(COALESCE({doc}, CAST('{{}}' AS JSONB)) || jsonb_build_object({', '.join(values)}) AS JSON)"
+
+def streak_query(day_expr, *criteria, group_col=None):
+    grouped = group_col is not None
+    yesterday = bindparam("yesterday", datetime.now(timezone.utc).date() - timedelta(days=1), type_=Date(), unique=True)
+    days = select(*([group_col.label("group_key")] if grouped else []), day_expr.label("day")).where(*criteria).distinct().subquery()
+    partition = [days.c.group_key] if grouped else []
+    islands = select(
+        *partition,
+        days.c.day,
+        (day_number(days.c.day) + func.row_number().over(partition_by=partition or None, order_by=days.c.day.desc())).label("island")
+    ).subquery()
+    partition = [islands.c.group_key] if grouped else []
+    runs = select(
+        *partition,
+        func.count().label("length"),
+        func.max(islands.c.day).label("last_day"),
+        (islands.c.island == func.max(islands.c.island).over(partition_by=partition or None)).label("is_latest")
+    ).group_by(*partition, islands.c.island).subquery()
+    partition = [runs.c.group_key] if grouped else []
+    return select(
+        *partition,
+        func.coalesce(func.max(case((and_(runs.c.is_latest, day_number(runs.c.last_day) >= day_number(yesterday)), runs.c.length), else_=0)), 0).label("current"),
+        func.coalesce(func.max(runs.c.length), 0).label("longest"),
+        func.max(runs.c.last_day).label("last_day")
+    ).group_by(*partition)
+
+def streak_summary(row) -> Dict[str, Any]:
+    return {"current": row.current, "longest": row.longest, "last_date": row.last_day}
+
+async def rebuild_analytics_rollup(db: AsyncSession, user_id: str, rollup: Optional[UserAnalyticsModel] = None) -> UserAnalyticsModel:
+    exempt_from_query_budget()
+    goal_rows = (await db.execute(
+        select(GoalModel.category, GoalModel.status, func.count())
+        .where(GoalModel.user_id == user_id)
+        .group_by(GoalModel.category, GoalModel.status)
+    )).all()
+    totals_rows = (await db.execute(select(
+        select(func.count()).where(HabitModel.user_id == user_id).scalar_subquery(),
+        select(func.coalesce(func.sum(HabitModel.streak), 0)).where(HabitModel.user_id == user_id).scalar_subquery(),
+        select(func.coalesce(func.max(HabitModel.streak), 0)).where(HabitModel.user_id == user_id).scalar_subquery(),
+        select(func.coalesce(func.max(HabitModel.best_streak), 0)).where(HabitModel.user_id == user_id).scalar_subquery(),
+        select(func.count()).select_from(HabitCompletionModel).where(HabitCompletionModel.user_id == user_id).scalar_subquery(),
+        select(func.count()).select_from(ExerciseModel).where(ExerciseModel.user_id == user_id).scalar_subquery()
+    ))).all()
+    mood_rows = (await db.execute(
+        select(func.coalesce(JournalEntryModel.mood, 'reflective'), func.count())
+        .where(JournalEntryModel.user_id == user_id)
+        .group_by(func.coalesce(JournalEntryModel.mood, 'reflective'))
+    )).all()
+    journal_rows = (await db.execute(streak_query(JournalEntryModel.date, JournalEntryModel.user_id == user_id))).all()
+    if rollup is None:
+        rollup = new_analytics_rollup(user_id)
+        db.add(rollup)
+
+    goals_by_category = {}
+    goals_total = goals_active = goals_completed = 0
+    for category, goal_status, count in goal_rows:
+        cat = category or 'personal'
+        entry = goals_by_category.setdefault(cat, {'total': 0, 'completed': 0})
+        entry['total'] += count
+        goals_total += count
+        if goal_status == 'completed':
+            entry['completed'] += count
+            goals_completed += count
+        elif goal_status == 'active':
+            goals_active += count
+    habits_total, streak_sum, max_streak, best_streak, completions_total, exercises_total = totals_rows[0]
+    journal_streak, _, journal_last_date = journal_rows[0]
+
+    rollup.goals_total = goals_total
+    rollup.goals_active = goals_active
+    rollup.goals_completed = goals_completed
+    rollup.goals_by_category = goals_by_category
+    rollup.habits_total = habits_total
+    rollup.habits_streak_sum = streak_sum
+    rollup.habits_max_streak = max_streak
+    rollup.habits_best_streak = best_streak
+    rollup.habit_completions_total = completions_total
+    rollup.journal_total = sum(count for _, count in mood_rows)
+    rollup.journal_streak = journal_streak
+    rollup.journal_last_date = journal_last_date
+    rollup.mood_distribution = {mood: count for mood, count in mood_rows}
+    rollup.exercises_total = exercises_total
+    rollup.updated_at = datetime.now(timezone.utc)
+    return rollup
+
+async def update_analytics_rollup(db: AsyncSession, user_id: str, **values):
+    # Call after staging the write: a missing rollup is rebuilt from rows that already include it.
+    result = await db.execute(
+        update(UserAnalyticsModel)
+        .where(UserAnalyticsModel.user_id == user_id)
+        .values(updated_at=datetime.now(timezone.utc), **values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await rebuild_analytics_rollup(db, user_id)
+
+def at_least(col, value):
+    return case((col < value, value), else_=col)
+
+def goal_rollup_values(*changes: Tuple[Optional[str], Optional[str], int]) -> Dict[str, Any]:
+    totals = {"goals_total": 0, "goals_active": 0, "goals_completed": 0}
+    by_category = {}
+    for category, goal_status, sign in changes:
+        entry = by_category.setdefault(category or 'personal', {'total': 0, 'completed': 0})
+        totals["goals_total"] += sign
+        entry['total'] += sign
+        if goal_status == 'completed':
+            totals["goals_completed"] += sign
+            entry['completed'] += sign
+        elif goal_status == 'active':
+            totals["goals_active"] += sign
+
+    values = {name: getattr(UserAnalyticsModel, name) + delta for name, delta in totals.items() if delta}
+    category_deltas = [
+        arg for category, entry in by_category.items() if entry['total'] or entry['completed']
+        for arg in (category, entry['total'], entry['completed'])
+    ]
+    if category_deltas:
+        values["goals_by_category"] = category_count_add(UserAnalyticsModel.goals_by_category, *category_deltas)
+    return values
+
+def habit_streak_extremes(user_id: str) -> Dict[str, Any]:
+    return {
+        "habits_max_streak": select(func.coalesce(func.max(HabitModel.streak), 0)).where(HabitModel.user_id == user_id).scalar_subquery(),
+        "habits_best_streak": select(func.coalesce(func.max(HabitModel.best_streak), 0)).where(HabitModel.user_id == user_id).scalar_subquery()
+    }
+
+def journal_rollup_values(date: str, mood: Optional[str]) -> Dict[str, Any]:
+    previous = (datetime.fromisoformat(date).date() - timedelta(days=1)).isoformat()
+    return {
+        "journal_total": UserAnalyticsModel.journal_total + 1,
+        "mood_distribution": json_count_add(UserAnalyticsModel.mood_distribution, mood or 'reflective', 1),
+        "journal_streak": case(
+            (UserAnalyticsModel.journal_last_date == date, UserAnalyticsModel.journal_streak),
+            (UserAnalyticsModel.journal_last_date == previous, UserAnalyticsModel.journal_streak + 1),
+            else_=1
+        ),
+        "journal_last_date": date
+    }
+
+COMPLETION_DATES_DAYS = int(os.environ.get('COMPLETION_DATES_DAYS', str(ANALYTICS_RECENT_DAYS)))
+
+async def load_completion_dates(db: AsyncSession, user_id: str, parent_ids: List[str], parent_col=HabitCompletionModel.habit_id) -> Dict[str, List[str]]:
+    completion_dates = {parent_id: [] for parent_id in parent_ids}
+    if not parent_ids:
+        return completion_dates
+    model = parent_col.class_
+    since = (datetime.now(timezone.utc).date() - timedelta(days=COMPLETION_DATES_DAYS - 1)).isoformat()
+    result = await db.execute(
+        select(parent_col, model.date)
+        .where(model.user_id == user_id, model.date >= since, parent_col.in_(parent_ids))
+        .order_by(model.date)
+    )
+    for parent_id, date in result.all():
+        completion_dates[parent_id].append(date)
+    return completion_dates
+
+def habit_response(habit: HabitModel, completion_dates: List[str]) -> Habit:
+    return Habit.model_validate(habit).model_copy(update={"completion_dates": completion_dates})
+
+async def reconcile_streaks():
+    yesterday = (datetime.now(timezone.utc).date() - timedelta(days=1)).isoformat()
+    async with async_session() as db:
+        result = await db.execute(
+            update(HabitModel)
+            .where(HabitModel.streak > 0, (HabitModel.last_completed.is_(None)) | (HabitModel.last_completed < yesterday))
+            .values(streak=0)
+            .returning(HabitModel.user_id)
+        )
+        user_ids = set(result.scalars().all())
+        if user_ids:
+            totals = await db.execute(
+                select(HabitModel.user_id, func.coalesce(func.sum(HabitModel.streak), 0), func.coalesce(func.max(HabitModel.streak), 0))
+                .where(HabitModel.user_id.in_(user_ids))
+                .group_by(HabitModel.user_id)
+            )
+            for uid, streak_sum, max_streak in totals.all():
+                await db.execute(
+                    update(UserAnalyticsModel)
+                    .where(UserAnalyticsModel.user_id == uid)
+                    .values(habits_streak_sum=streak_sum, habits_max_streak=max_streak, updated_at=datetime.now(timezone.utc))
+                )
+        await db.commit()
+    logger.info(f"Reset broken habit streaks for {len(user_ids)} users")
+
+async def prune_tombstones():
+    cutoff = datetime.now(timezone.utc) - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+    async with async_session() as db:
+        result = await db.execute(delete(TombstoneModel).where(TombstoneModel.deleted_at < cutoff))
+        await db.commit()
+    logger.info(f"Pruned {result.rowcount} tombstones older than {SYNC_TOMBSTONE_RETENTION_DAYS} days")
+
+async def prune_expired_revoked_tokens():
+    async with async_session() as db:
+        result = await db.execute(delete(RevokedTokenModel).where(RevokedTokenModel.expires_at < datetime.now(timezone.utc)))
+        await db.commit()
+    logger.info(f"Pruned {result.rowcount} revoked tokens past their expiry")
+
+async def prune_idempotency_keys():
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+    async with async_session() as db:
+        result = await db.execute(delete(IdempotencyKeyModel).where(IdempotencyKeyModel.created_at < cutoff))
+        await db.commit()
+    logger.info(f"Pruned {result.rowcount} idempotency keys older than {IDEMPOTENCY_KEY_TTL_HOURS} hours")
+
+def find_missing_indexes(sync_conn) -> List[Tuple[str, str]]:
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        live_indexes = [tuple(i["column_names"]) for i in inspector.get_indexes(table.name)]
+        live_indexes += [tuple(u["column_names"]) for u in inspector.get_unique_constraints(table.name)]
+        for index in table.indexes:
+            if tuple(c.name for c in index.columns) not in live_indexes:
+                missing.append((table.name, index.name))
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and tuple(c.name for c in constraint.columns) not in live_indexes:
+                missing.append((table.name, constraint.name))
+    return missing
+
+async def check_schema_indexes():
+    async with engine.connect() as conn:
+        missing = await conn.run_sync(find_missing_indexes)
+    for table_name, index_name in missing:
+        logger.warning(f"Missing index {index_name} on {table_name}")
+    return missing
+
+def migrate_baseline_tables(sync_conn):
+    Base.metadata.create_all(sync_conn)
+
+def migrate_habit_completions(sync_conn):
+    columns = [c["name"] for c in inspect(sync_conn).get_columns("habits")]
+    if "completion_dates" not in columns:
+        return
+
+    rows = sync_conn.execute(text("SELECT id, user_id, completion_dates FROM habits")).all()
+    existing = set(sync_conn.execute(select(HabitCompletionModel.habit_id, HabitCompletionModel.date)).all())
+    migrated = 0
+    for habit_id, habit_user_id, raw_dates in rows:
+        dates = json.loads(raw_dates) if isinstance(raw_dates, str) else (raw_dates or [])
+        new_rows = [
+            {"id": str(uuid.uuid4()), "habit_id": habit_id, "user_id": habit_user_id, "date": d, "created_at": datetime.now(timezone.utc)}
+            for d in sorted(set(dates)) if (habit_id, d) not in existing
+        ]
+        if new_rows:
+            sync_conn.execute(HabitCompletionModel.__table__.insert(), new_rows)
+            migrated += len(new_rows)
+    sync_conn.execute(text("ALTER TABLE habits DROP COLUMN completion_dates"))
+    logger.info(f"Migrated {migrated} habit completions from {len(rows)} habits")
+
+def create_indexes(sync_conn, indexes):
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    for table_name, index_name, columns, unique in indexes:
+        if table_name not in existing_tables:
+            continue
+        live = inspector.get_indexes(table_name) + inspector.get_unique_constraints(table_name)
+        if any(i["name"] == index_name or tuple(i["column_names"]) == columns for i in live):
+            continue
+        sync_conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX {index_name} ON {table_name} ({', '.join(columns)})"))
+        logger.info(f"Created index {index_name} on {table_name}")
+
+QUERY_INDEXES = [
+    ("goals", "ix_goals_user_created", ("user_id", "created_at"), False),
+    ("habits", "ix_habits_user_created", ("user_id", "created_at"), False),
+    ("habit_completions", "uq_habit_completions_habit_date", ("habit_id", "date"), True),
+    ("habit_completions", "ix_habit_completions_user_date", ("user_id", "date"), False),
+    ("vision_board_items", "ix_vision_board_items_user_created", ("user_id", "created_at"), False),
+    ("journal_entries", "ix_journal_entries_user_date", ("user_id", "date"), False),
+    ("exercises", "ix_exercises_user_date", ("user_id", "date"), False),
+    ("ritual_completions", "ix_ritual_completions_user_completed", ("user_id", "completed_at"), False),
+    ("wisdom_favorites", "uq_wisdom_favorites_user_quote", ("user_id", "quote_id"), True),
+    ("wisdom_favorites", "ix_wisdom_favorites_user_created", ("user_id", "created_at"), False),
+    ("identity_statements", "ix_identity_statements_user_created", ("user_id", "created_at"), False),
+    ("identity_evidence", "ix_identity_evidence_user_identity_created", ("user_id", "identity_id", "created_at"), False),
+    ("obstacles", "ix_obstacles_user_created", ("user_id", "created_at"), False),
+    ("desire_visualizations", "ix_desire_visualizations_user_created", ("user_id", "created_at"), False),
+    ("premeditatio_practices", "ix_premeditatio_practices_user_created", ("user_id", "created_at"), False),
+    ("habit_chains", "ix_habit_chains_user_created", ("user_id", "created_at"), False),
+    ("habit_chain_completions", "ix_habit_chain_completions_user_chain_date", ("user_id", "chain_id", "date"), False),
+    ("two_minute_rules", "ix_two_minute_rules_user_created", ("user_id", "created_at"), False),
+    ("mastermind_members", "ix_mastermind_members_user_created", ("user_id", "created_at"), False),
+    ("mastermind_meetings", "ix_mastermind_meetings_user_created", ("user_id", "created_at"), False),
+    ("mastermind_meetings", "ix_mastermind_meetings_user_date", ("user_id", "date"), False),
+]
+
+def migrate_declared_indexes(sync_conn):
+    result = sync_conn.execute(text(
+        "DELETE FROM wisdom_favorites WHERE id IN (SELECT id FROM ("
+        "SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id, quote_id ORDER BY created_at, id) AS position FROM wisdom_favorites"
+        ") ranked WHERE position > 1)"
+    ))
+    if result.rowcount:
+        logger.info(f"Removed {result.rowcount} duplicate wisdom favorites")
+    create_indexes(sync_conn, QUERY_INDEXES)
+
+def migrate_two_minute_rule_completions(sync_conn):
+    TwoMinuteRuleCompletionModel.__table__.create(sync_conn, checkfirst=True)
+    columns = [c["name"] for c in inspect(sync_conn).get_columns("two_minute_rules")]
+    if "completion_count" not in columns:
+        sync_conn.execute(text("ALTER TABLE two_minute_rules ADD COLUMN completion_count INTEGER NOT NULL DEFAULT 0"))
+    if "last_completed" not in columns:
+        sync_conn.execute(text("ALTER TABLE two_minute_rules ADD COLUMN last_completed VARCHAR(50)"))
+    if "completion_dates" not in columns:
+        return
+
+    rows = sync_conn.execute(text("SELECT id, user_id, completion_dates FROM two_minute_rules")).all()
+    for rule_id, rule_user_id, raw_dates in rows:
+        dates = sorted(set(json.loads(raw_dates) if isinstance(raw_dates, str) else (raw_dates or [])))
+        if not dates:
+            continue
+        sync_conn.execute(TwoMinuteRuleCompletionModel.__table__.insert(), [
+            {"id": str(uuid.uuid4()), "rule_id": rule_id, "user_id": rule_user_id, "date": d, "created_at": datetime.now(timezone.utc)}
+            for d in dates
+        ])
+        sync_conn.execute(
+            update(TwoMinuteRuleModel.__table__)
+            .where(TwoMinuteRuleModel.__table__.c.id == rule_id)
+            .values(completion_count=len(dates), last_completed=dates[-1])
+        )
+    sync_conn.execute(text("ALTER TABLE two_minute_rules DROP COLUMN completion_dates"))
+    logger.info(f"Migrated two-minute rule completions for {len(rows)} rules")
+
+def migrate_revoked_tokens(sync_conn):
+    RevokedTokenModel.__table__.create(sync_conn, checkfirst=True)
+
+SEARCH_BACKFILL_QUERIES = {
+    "journal": "SELECT 'journal', id, user_id, content, created_at FROM journal_entries",
+    "obstacle": "SELECT 'obstacle', id, user_id, TRIM(COALESCE(obstacle_text, '') || ' ' || COALESCE(perception, '') || ' ' || COALESCE(action, '') || ' ' || COALESCE(will, '')), created_at FROM obstacles",
+    "mastermind": "SELECT 'mastermind', id, user_id, insights, created_at FROM mastermind_meetings",
+    "evidence": "SELECT 'evidence', id, user_id, evidence_text, created_at FROM identity_evidence",
+}
+
+def migrate_search_index(sync_conn):
+    if sync_conn.dialect.name == "postgresql":
+        sync_conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_documents ("
+            "source VARCHAR(20) NOT NULL, source_id VARCHAR(36) NOT NULL, user_id VARCHAR(36) NOT NULL, "
+            "body TEXT NOT NULL, created_at TIMESTAMPTZ NOT NULL, "
+            "document TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', body)) STORED, "
+            "PRIMARY KEY (source, source_id))"
+        ))
+        sync_conn.execute(text("CREATE INDEX IF NOT EXISTS ix_search_documents_document ON search_documents USING GIN (document)"))
+        sync_conn.execute(text("CREATE INDEX IF NOT EXISTS ix_search_documents_user ON search_documents (user_id)"))
+        conflict = " ON CONFLICT (source, source_id) DO NOTHING"
+    else:
+        sync_conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents USING fts5("
+            "body, source UNINDEXED, source_id UNINDEXED, user_id UNINDEXED, created_at UNINDEXED, tokenize='porter unicode61')"
+        ))
+        sync_conn.execute(text("DELETE FROM search_documents"))
+        conflict = ""
+    for select_sql in SEARCH_BACKFILL_QUERIES.values():
+        sync_conn.execute(text(f"INSERT INTO search_documents (source, source_id, user_id, body, created_at) {select_sql}{conflict}"))
+
+SYNC_INDEXES = [
+    (table_name, f"ix_{table_name}_user_updated", ("user_id", "updated_at"), False) for table_name in (
+        "goals", "habits", "journal_entries", "exercises", "ritual_completions", "wisdom_favorites", "vision_board_items",
+        "identity_statements", "identity_evidence", "obstacles", "desire_visualizations", "premeditatio_practices",
+        "habit_chains", "two_minute_rules", "mastermind_members", "mastermind_meetings"
+    )
+]
+
+def migrate_sync_tracking(sync_conn):
+    inspector = inspect(sync_conn)
+    for model in SYNC_MODELS:
+        table = model.__table__
+        if "updated_at" in [c["name"] for c in inspector.get_columns(table.name)]:
+            continue
+        column_type = table.c.updated_at.type.compile(dialect=sync_conn.dialect)
+        source = "created_at" if "created_at" in table.c else "completed_at"
+        sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN updated_at {column_type}"))
+        sync_conn.execute(text(f"UPDATE {table.name} SET updated_at = {source}"))
+    TombstoneModel.__table__.create(sync_conn, checkfirst=True)
+    create_indexes(sync_conn, SYNC_INDEXES)
+
+def migrate_idempotency_keys(sync_conn):
+    IdempotencyKeyModel.__table__.create(sync_conn, checkfirst=True)
+
+def migrate_analytics_recent_completions(sync_conn):
+    columns = [c["name"] for c in inspect(sync_conn).get_columns("user_analytics")]
+    if "habit_completions_recent" in columns:
+        sync_conn.execute(text("ALTER TABLE user_analytics DROP COLUMN habit_completions_recent"))
+
+MIGRATIONS = [
+    (1, "create baseline tables", migrate_baseline_tables),
+    (2, "move habits.completion_dates into habit_completions", migrate_habit_completions),
+    (3, "create composite query indexes", migrate_declared_indexes),
+    (4, "move two_minute_rules.completion_dates into two_minute_rule_completions", migrate_two_minute_rule_completions),
+    (5, "create revoked_tokens", migrate_revoked_tokens),
+    (6, "create full-text search index", migrate_search_index),
+    (7, "add updated_at to synced tables and create tombstones", migrate_sync_tracking),
+    (8, "create idempotency_keys", migrate_idempotency_keys),
+    (9, "drop user_analytics.habit_completions_recent", migrate_analytics_recent_completions),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+MIGRATION_LOCK_ID = 7242019
+
+async def run_migrations():
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+        await conn.run_sync(SchemaMigrationModel.__table__.create, checkfirst=True)
+        applied = set((await conn.execute(select(SchemaMigrationModel.version))).scalars().all())
+        for version, name, migration in MIGRATIONS:
+            if version in applied:
+                continue
+            await conn.run_sync(migration)
+            await conn.execute(SchemaMigrationModel.__table__.insert().values(version=version, name=name, applied_at=datetime.now(timezone.utc)))
+            logger.info(f"Applied migration {version}: {name}")
+    logger.info(f"Database schema at version {SCHEMA_VERSION}")
+
+async def get_schema_version() -> Optional[int]:
+    async with engine.connect() as conn:
+        try:
+            return (await conn.execute(select(func.max(SchemaMigrationModel.version)))).scalar()
+        except DBAPIError:
+            return None
+
+async def verify_schema_version():
+    version = await get_schema_version()
+    if version is None or version < SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema is at version {version}, expected {SCHEMA_VERSION}. Run 'python server.py migrate' first.")
+    if version > SCHEMA_VERSION:
+        logger.warning(f"Database schema version {version} is newer than this build ({SCHEMA_VERSION})")
+
+async def rebuild_analytics(user_id: Optional[str] = None):
+    async with async_session() as db:
+        if user_id:
+            user_ids = [user_id]
+        else:
+            user_ids = (await db.execute(select(UserModel.id))).scalars().all()
+
+    for uid in user_ids:
+        async with async_session() as db:
+            result = await db.execute(select(UserAnalyticsModel).where(UserAnalyticsModel.user_id == uid).with_for_update())
+            await rebuild_analytics_rollup(db, uid, result.scalar_one_or_none())
+            await db.commit()
+    logger.info(f"Rebuilt analytics rollups for {len(user_ids)} users")
+
 
 @api_router.post("/auth/register")
+@query_budget(queries=3, commits=1)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(UserModel).where(UserModel.email == user_data.email))
     existing_user = result.scalar_one_or_none()
@@ -574,26 +1986,47 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         id=user_id,
         email=user_data.email,
         name=user_data.name,
-        password_hash=hash_password(user_data.password)
+        password_hash=await hash_password(user_data.password)
     )
     db.add(user)
+    db.add(new_analytics_rollup(user_id))
     await db.commit()
     
     token = create_token(user_id)
     return {"token": token, "user": {"id": user_id, "email": user_data.email, "name": user_data.name}}
 
 @api_router.post("/auth/login")
+@query_budget(queries=2, commits=1)
 async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(UserModel).where(UserModel.email == credentials.email))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_password(credentials.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+        password_hash_stats["rehashed"] += 1
     
     token = create_token(user.id)
     return {"token": token, "user": {"id": user.id, "email": user.email, "name": user.name}}
 
+@api_router.post("/auth/logout")
+@query_budget(queries=1, commits=1)
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    key = token_hash(credentials.credentials)
+    _, expires_at = decode_token(credentials.credentials)
+    mark_token_revoked(key, expires_at)
+    if TOKEN_REVOCATION_STORE == "database":
+        db.add(RevokedTokenModel(token_hash=key, user_id=user_id, expires_at=datetime.fromtimestamp(expires_at, timezone.utc)))
+        await db.commit()
+    return {"message": "Logged out"}
+
 
 @api_router.post("/goals", response_model=Goal)
+@query_budget(queries=2, commits=1)
 async def create_goal(goal_data: GoalCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     milestones = goal_data.milestones or []
     progress = 0
@@ -614,17 +2047,24 @@ async def create_goal(goal_data: GoalCreate, user_id: str = Depends(get_current_
         progress=progress
     )
     db.add(goal)
+    await update_analytics_rollup(db, user_id, **goal_rollup_values((goal.category, 'active', 1)))
     await db.commit()
-    await db.refresh(goal)
+    await publish_event(user_id, "goal.created", id=goal.id, status=goal.status, progress=goal.progress)
     return Goal.model_validate(goal)
 
 @api_router.get("/goals", response_model=List[Goal])
-async def get_goals(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(GoalModel).where(GoalModel.user_id == user_id))
-    goals = result.scalars().all()
-    return [Goal.model_validate(g) for g in goals]
+@query_budget(queries=1, commits=0)
+async def get_goals(response: Response, goal_status: Optional[str] = Query(None, alias="status"), category: Optional[str] = None, page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = select(GoalModel).where(GoalModel.user_id == user_id)
+    if goal_status:
+        query = query.where(GoalModel.status == goal_status)
+    if category:
+        query = query.where(GoalModel.category == category)
+    goals = await fetch_page(db, query, GoalModel.created_at, GoalModel.id, page, response, descending=False)
+    return json_response(List[Goal], goals, response)
 
 @api_router.put("/goals/{goal_id}", response_model=Goal)
+@query_budget(queries=3, commits=1)
 async def update_goal(goal_id: str, goal_update: GoalUpdate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(GoalModel).where(GoalModel.id == goal_id, GoalModel.user_id == user_id))
     goal = result.scalar_one_or_none()
@@ -643,25 +2083,34 @@ async def update_goal(goal_id: str, goal_update: GoalUpdate, user_id: str = Depe
     
     update_data['updated_at'] = datetime.now(timezone.utc)
     
+    removed = (goal.category, goal.status, -1)
     for key, value in update_data.items():
         setattr(goal, key, value)
+    rollup_values = goal_rollup_values(removed, (goal.category, goal.status, 1))
+    if rollup_values:
+        await update_analytics_rollup(db, user_id, **rollup_values)
     
     await db.commit()
-    await db.refresh(goal)
+    await publish_event(user_id, "goal.updated", id=goal.id, status=goal.status, progress=goal.progress)
     return Goal.model_validate(goal)
 
 @api_router.delete("/goals/{goal_id}")
+@query_budget(queries=4, commits=1)
 async def delete_goal(goal_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(GoalModel).where(GoalModel.id == goal_id, GoalModel.user_id == user_id))
     goal = result.scalar_one_or_none()
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     await db.delete(goal)
+    record_tombstone(db, user_id, "goals", goal.id)
+    await update_analytics_rollup(db, user_id, **goal_rollup_values((goal.category, goal.status, -1)))
     await db.commit()
+    await publish_event(user_id, "goal.deleted", id=goal_id)
     return {"message": "Goal deleted"}
 
 
 @api_router.post("/habits", response_model=Habit)
+@query_budget(queries=2, commits=1)
 async def create_habit(habit_data: HabitCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     habit = HabitModel(
         id=str(uuid.uuid4()),
@@ -671,75 +2120,107 @@ async def create_habit(habit_data: HabitCreate, user_id: str = Depends(get_curre
         frequency=habit_data.frequency
     )
     db.add(habit)
+    await update_analytics_rollup(db, user_id, habits_total=UserAnalyticsModel.habits_total + 1)
     await db.commit()
-    await db.refresh(habit)
-    return Habit.model_validate(habit)
+    await publish_event(user_id, "habit.created", id=habit.id)
+    return habit_response(habit, [])
 
 @api_router.get("/habits", response_model=List[Habit])
-async def get_habits(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(HabitModel).where(HabitModel.user_id == user_id))
-    habits = result.scalars().all()
-    return [Habit.model_validate(h) for h in habits]
+@query_budget(queries=2, commits=0)
+async def get_habits(response: Response, frequency: Optional[str] = None, page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = select(HabitModel).where(HabitModel.user_id == user_id)
+    if frequency:
+        query = query.where(HabitModel.frequency == frequency)
+    habits = await fetch_page(db, query, HabitModel.created_at, HabitModel.id, page, response, descending=False)
+    completion_dates = await load_completion_dates(db, user_id, [h.id for h in habits])
+    return json_response(List[Habit], [habit_response(h, completion_dates[h.id]) for h in habits], response)
 
 @api_router.post("/habits/{habit_id}/complete")
+@query_budget(queries=4, commits=1)
 async def complete_habit(habit_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(HabitModel).where(HabitModel.id == habit_id, HabitModel.user_id == user_id))
     habit = result.scalar_one_or_none()
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    today = datetime.now(timezone.utc).date().isoformat()
-    completion_dates = list(habit.completion_dates or [])
+    today_date = datetime.now(timezone.utc).date()
+    today = today_date.isoformat()
     streak = habit.streak or 0
     
-    if today not in completion_dates:
-        completion_dates.append(today)
-        sorted_dates = sorted(completion_dates, reverse=True)
-        streak = 1
-        for i in range(len(sorted_dates) - 1):
-            current = datetime.fromisoformat(sorted_dates[i]).date()
-            previous = datetime.fromisoformat(sorted_dates[i + 1]).date()
-            if (current - previous).days == 1:
-                streak += 1
-            else:
-                break
-        
+    if habit.last_completed != today:
+        old_streak = habit.streak or 0
+        yesterday = (today_date - timedelta(days=1)).isoformat()
+        streak = old_streak + 1 if habit.last_completed == yesterday else 1
         best_streak = max(habit.best_streak or 0, streak)
-        habit.completion_dates = completion_dates
+        db.add(HabitCompletionModel(id=str(uuid.uuid4()), habit_id=habit.id, user_id=user_id, date=today))
         habit.last_completed = today
         habit.streak = streak
         habit.best_streak = best_streak
-        await db.commit()
+        rollup_values = {
+            "habit_completions_total": UserAnalyticsModel.habit_completions_total + 1,
+            "habits_streak_sum": UserAnalyticsModel.habits_streak_sum + (streak - old_streak),
+            "habits_max_streak": at_least(UserAnalyticsModel.habits_max_streak, streak),
+            "habits_best_streak": at_least(UserAnalyticsModel.habits_best_streak, best_streak)
+        }
+        if streak < old_streak:
+            rollup_values.update(habit_streak_extremes(user_id))
+        try:
+            await update_analytics_rollup(db, user_id, **rollup_values)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            result = await db.execute(select(HabitModel.streak).where(HabitModel.id == habit_id))
+            streak = result.scalar() or 0
+        else:
+            await publish_event(user_id, "habit.completed", id=habit_id, date=today, streak=streak, best_streak=best_streak)
     
     return {"message": "Habit completed", "streak": streak}
 
 @api_router.put("/habits/{habit_id}")
+@query_budget(queries=2, commits=1)
 async def update_habit(habit_id: str, habit_update: HabitUpdate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(HabitModel).where(HabitModel.id == habit_id, HabitModel.user_id == user_id))
+    update_data = {k: v for k, v in habit_update.model_dump().items() if v is not None}
+    if update_data:
+        result = await db.execute(
+            update(HabitModel)
+            .where(HabitModel.id == habit_id, HabitModel.user_id == user_id)
+            .values(**update_data)
+            .returning(HabitModel)
+        )
+    else:
+        result = await db.execute(select(HabitModel).where(HabitModel.id == habit_id, HabitModel.user_id == user_id))
     habit = result.scalar_one_or_none()
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
-    
-    update_data = {k: v for k, v in habit_update.model_dump().items() if v is not None}
-    for key, value in update_data.items():
-        setattr(habit, key, value)
-    
     await db.commit()
-    await db.refresh(habit)
-    return Habit.model_validate(habit)
+    await publish_event(user_id, "habit.updated", id=habit.id)
+    completion_dates = await load_completion_dates(db, user_id, [habit.id])
+    return habit_response(habit, completion_dates[habit.id])
 
 @api_router.delete("/habits/{habit_id}")
+@query_budget(queries=5, commits=1)
 async def delete_habit(habit_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(HabitModel).where(HabitModel.id == habit_id, HabitModel.user_id == user_id))
     habit = result.scalar_one_or_none()
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     await db.delete(habit)
+    record_tombstone(db, user_id, "habits", habit.id)
+    completions = await db.execute(delete(HabitCompletionModel).where(HabitCompletionModel.habit_id == habit.id))
+    await update_analytics_rollup(
+        db, user_id,
+        habits_total=UserAnalyticsModel.habits_total - 1,
+        habits_streak_sum=UserAnalyticsModel.habits_streak_sum - (habit.streak or 0),
+        habit_completions_total=UserAnalyticsModel.habit_completions_total - completions.rowcount,
+        **habit_streak_extremes(user_id)
+    )
     await db.commit()
+    await publish_event(user_id, "habit.deleted", id=habit_id)
     return {"message": "Habit deleted"}
 
 
 @api_router.post("/vision-board", response_model=VisionBoardItem)
+@query_budget(queries=1, commits=1)
 async def create_vision_item(item_data: VisionBoardItemCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     item = VisionBoardItemModel(
         id=str(uuid.uuid4()),
@@ -750,27 +2231,35 @@ async def create_vision_item(item_data: VisionBoardItemCreate, user_id: str = De
     )
     db.add(item)
     await db.commit()
-    await db.refresh(item)
+    await invalidate_cached_response(user_id, "vision_board")
     return VisionBoardItem.model_validate(item)
 
 @api_router.get("/vision-board", response_model=List[VisionBoardItem])
-async def get_vision_board(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@query_budget(queries=1, commits=0)
+async def get_vision_board(request: Request, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    cached = await get_cached_response(request, user_id, "vision_board")
+    if cached is not None:
+        return cached
     result = await db.execute(select(VisionBoardItemModel).where(VisionBoardItemModel.user_id == user_id))
     items = result.scalars().all()
-    return [VisionBoardItem.model_validate(i) for i in items]
+    return await cache_response(request, user_id, "vision_board", dump_json(List[VisionBoardItem], items))
 
 @api_router.delete("/vision-board/{item_id}")
+@query_budget(queries=3, commits=1)
 async def delete_vision_item(item_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(VisionBoardItemModel).where(VisionBoardItemModel.id == item_id, VisionBoardItemModel.user_id == user_id))
     item = result.scalar_one_or_none()
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     await db.delete(item)
+    record_tombstone(db, user_id, "vision_board_items", item.id)
     await db.commit()
+    await invalidate_cached_response(user_id, "vision_board")
     return {"message": "Item deleted"}
 
 
 @api_router.post("/journal", response_model=JournalEntry)
+@query_budget(queries=3, commits=1)
 async def create_journal_entry(entry_data: JournalEntryCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     entry = JournalEntryModel(
         id=str(uuid.uuid4()),
@@ -781,18 +2270,24 @@ async def create_journal_entry(entry_data: JournalEntryCreate, user_id: str = De
         date=datetime.now(timezone.utc).date().isoformat()
     )
     db.add(entry)
+    await index_search_documents(db, user_id, "journal", [(entry.id, entry.content)])
+    await update_analytics_rollup(db, user_id, **journal_rollup_values(entry.date, entry.mood))
     await db.commit()
-    await db.refresh(entry)
+    await publish_event(user_id, "journal.created", id=entry.id, date=entry.date, mood=entry.mood)
     return JournalEntry.model_validate(entry)
 
 @api_router.get("/journal", response_model=List[JournalEntry])
-async def get_journal_entries(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(JournalEntryModel).where(JournalEntryModel.user_id == user_id).order_by(JournalEntryModel.date.desc()))
-    entries = result.scalars().all()
-    return [JournalEntry.model_validate(e) for e in entries]
+@query_budget(queries=1, commits=0)
+async def get_journal_entries(response: Response, date_from: Optional[str] = None, date_to: Optional[str] = None, mood: Optional[str] = None, page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = filter_date_range(select(JournalEntryModel).where(JournalEntryModel.user_id == user_id), JournalEntryModel.date, date_from, date_to)
+    if mood:
+        query = query.where(JournalEntryModel.mood == mood)
+    entries = await fetch_page(db, query, JournalEntryModel.date, JournalEntryModel.id, page, response)
+    return json_response(List[JournalEntry], entries, response)
 
 
 @api_router.post("/exercises", response_model=Exercise)
+@query_budget(queries=2, commits=1)
 async def create_exercise(exercise_data: ExerciseCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     exercise = ExerciseModel(
         id=str(uuid.uuid4()),
@@ -803,118 +2298,136 @@ async def create_exercise(exercise_data: ExerciseCreate, user_id: str = Depends(
         date=datetime.now(timezone.utc).date().isoformat()
     )
     db.add(exercise)
+    await update_analytics_rollup(db, user_id, exercises_total=UserAnalyticsModel.exercises_total + 1)
     await db.commit()
-    await db.refresh(exercise)
     return Exercise.model_validate(exercise)
 
 @api_router.get("/exercises", response_model=List[Exercise])
-async def get_exercises(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(ExerciseModel).where(ExerciseModel.user_id == user_id).order_by(ExerciseModel.date.desc()))
-    exercises = result.scalars().all()
-    return [Exercise.model_validate(e) for e in exercises]
+@query_budget(queries=1, commits=0)
+async def get_exercises(response: Response, date_from: Optional[str] = None, date_to: Optional[str] = None, exercise_type: Optional[str] = None, page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = filter_date_range(select(ExerciseModel).where(ExerciseModel.user_id == user_id), ExerciseModel.date, date_from, date_to)
+    if exercise_type:
+        query = query.where(ExerciseModel.exercise_type == exercise_type)
+    exercises = await fetch_page(db, query, ExerciseModel.date, ExerciseModel.id, page, response)
+    return json_response(List[Exercise], exercises, response)
 
 
 @api_router.get("/analytics/overview")
+@query_budget(queries=2, commits=0)
 async def get_analytics(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    goals_result = await db.execute(select(GoalModel).where(GoalModel.user_id == user_id))
-    goals = goals_result.scalars().all()
-    
-    habits_result = await db.execute(select(HabitModel).where(HabitModel.user_id == user_id))
-    habits = habits_result.scalars().all()
-    
-    journal_result = await db.execute(select(JournalEntryModel).where(JournalEntryModel.user_id == user_id))
-    journal_entries = journal_result.scalars().all()
-    
-    exercises_result = await db.execute(select(ExerciseModel).where(ExerciseModel.user_id == user_id))
-    exercises = exercises_result.scalars().all()
-    
-    total_goals = len(goals)
-    completed_goals = len([g for g in goals if g.status == 'completed'])
-    active_goals = len([g for g in goals if g.status == 'active'])
-    
-    total_habits = len(habits)
-    max_streak = max([h.streak or 0 for h in habits], default=0)
-    best_streak_ever = max([h.best_streak or 0 for h in habits], default=0)
-    avg_streak = sum([h.streak or 0 for h in habits]) / total_habits if total_habits > 0 else 0
-    
-    journal_count = len(journal_entries)
-    exercise_count = len(exercises)
+    result = await db.execute(select(UserAnalyticsModel).where(UserAnalyticsModel.user_id == user_id))
+    rollup = result.scalar_one_or_none()
+    if not rollup:
+        rollup = await rebuild_analytics_rollup(db, user_id)
+        await db.commit()
     
     today = datetime.now(timezone.utc).date()
-    last_7_days = [(today - timedelta(days=i)).isoformat() for i in range(7)]
-    
-    habit_completions = []
-    for date in last_7_days:
-        completed_today = sum(1 for h in habits if date in (h.completion_dates or []))
-        habit_completions.append({"date": date, "completed": completed_today, "total": total_habits})
-    
-    total_completions = sum(len(h.completion_dates or []) for h in habits)
-    
-    goals_by_category = {}
-    for g in goals:
-        cat = g.category or 'personal'
-        if cat not in goals_by_category:
-            goals_by_category[cat] = {'total': 0, 'completed': 0}
-        goals_by_category[cat]['total'] += 1
-        if g.status == 'completed':
-            goals_by_category[cat]['completed'] += 1
-    
-    journal_streak = 0
-    if journal_entries:
-        sorted_entries = sorted(journal_entries, key=lambda x: x.date or '', reverse=True)
-        check_date = today
-        for entry in sorted_entries:
-            if entry.date == check_date.isoformat():
-                journal_streak += 1
-                check_date -= timedelta(days=1)
-            elif entry.date < check_date.isoformat():
-                break
-    
-    mood_counts = {}
-    for entry in journal_entries:
-        mood = entry.mood or 'reflective'
-        mood_counts[mood] = mood_counts.get(mood, 0) + 1
+    window = _recent_window(today)
+    recent = dict((await db.execute(
+        select(HabitCompletionModel.date, func.count())
+        .where(HabitCompletionModel.user_id == user_id, HabitCompletionModel.date >= window[-1])
+        .group_by(HabitCompletionModel.date)
+    )).all())
+    total_goals = rollup.goals_total
+    total_habits = rollup.habits_total
+    habit_completions = [{"date": date, "completed": recent.get(date, 0), "total": total_habits} for date in window]
+    journal_streak = rollup.journal_streak if rollup.journal_last_date == today.isoformat() else 0
+    avg_streak = rollup.habits_streak_sum / total_habits if total_habits > 0 else 0
     
     return {
         "goals": {
             "total": total_goals,
-            "active": active_goals,
-            "completed": completed_goals,
-            "completion_rate": round(completed_goals / total_goals * 100, 1) if total_goals > 0 else 0,
-            "by_category": goals_by_category
+            "active": rollup.goals_active,
+            "completed": rollup.goals_completed,
+            "completion_rate": round(rollup.goals_completed / total_goals * 100, 1) if total_goals > 0 else 0,
+            "by_category": {category: entry for category, entry in (rollup.goals_by_category or {}).items() if entry['total'] > 0}
         },
         "habits": {
             "total": total_habits,
-            "max_streak": max_streak,
-            "best_streak_ever": best_streak_ever,
+            "max_streak": rollup.habits_max_streak,
+            "best_streak_ever": rollup.habits_best_streak,
             "avg_streak": round(avg_streak, 1),
-            "total_completions": total_completions
+            "total_completions": rollup.habit_completions_total
         },
         "journal": {
-            "total_entries": journal_count,
+            "total_entries": rollup.journal_total,
             "current_streak": journal_streak,
-            "mood_distribution": mood_counts
+            "mood_distribution": {mood: count for mood, count in (rollup.mood_distribution or {}).items() if count > 0}
         },
         "exercises": {
-            "total_completed": exercise_count
+            "total_completed": rollup.exercises_total
         },
         "habit_completions_7_days": habit_completions
     }
 
+@api_router.get("/streaks")
+@query_budget(queries=4, commits=0)
+async def get_streaks(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    journal = (await db.execute(streak_query(JournalEntryModel.date, JournalEntryModel.user_id == user_id))).one()
+    rituals = (await db.execute(streak_query(func.date(RitualCompletionModel.completed_at), RitualCompletionModel.user_id == user_id))).one()
+    habits = (await db.execute(streak_query(HabitCompletionModel.date, HabitCompletionModel.user_id == user_id, group_col=HabitCompletionModel.habit_id))).all()
+    rules = (await db.execute(streak_query(TwoMinuteRuleCompletionModel.date, TwoMinuteRuleCompletionModel.user_id == user_id, group_col=TwoMinuteRuleCompletionModel.rule_id))).all()
+    return {
+        "journal": streak_summary(journal),
+        "rituals": streak_summary(rituals),
+        "habits": {row.group_key: streak_summary(row) for row in habits},
+        "two_minute_rules": {row.group_key: streak_summary(row) for row in rules}
+    }
+
+@api_router.get("/dashboard")
+@query_budget(queries=4, commits=0)
+async def get_dashboard(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    now = datetime.now(timezone.utc)
+    today = now.date().isoformat()
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    habits = (await db.execute(
+        select(HabitModel.id, HabitModel.name, HabitModel.streak, HabitModel.last_completed)
+        .where(HabitModel.user_id == user_id)
+        .order_by(HabitModel.created_at)
+    )).all()
+    goals = (await db.execute(
+        select(GoalModel.id, GoalModel.title, GoalModel.category, GoalModel.progress, GoalModel.target_date)
+        .where(GoalModel.user_id == user_id, GoalModel.status == "active")
+        .order_by(GoalModel.created_at)
+    )).all()
+    rituals = (await db.execute(
+        select(RitualCompletionModel.id, RitualCompletionModel.ritual_type, RitualCompletionModel.completed_at)
+        .where(RitualCompletionModel.user_id == user_id, RitualCompletionModel.completed_at >= day_start)
+        .order_by(RitualCompletionModel.completed_at)
+    )).all()
+    latest_journal_date, desire_text = (await db.execute(select(
+        select(func.max(JournalEntryModel.date)).where(JournalEntryModel.user_id == user_id).scalar_subquery(),
+        select(BurningDesireModel.desire_text).where(BurningDesireModel.user_id == user_id).scalar_subquery()
+    ))).one()
+    
+    habit_items = [{"id": h.id, "name": h.name, "streak": h.streak, "completed_today": h.last_completed == today} for h in habits]
+    return {
+        "date": today,
+        "habits": habit_items,
+        "habits_completed": sum(1 for h in habit_items if h["completed_today"]),
+        "habits_total": len(habit_items),
+        "goals": [{"id": g.id, "title": g.title, "category": g.category, "progress": g.progress, "target_date": g.target_date} for g in goals],
+        "latest_journal_date": latest_journal_date,
+        "rituals": [{"id": r.id, "ritual_type": r.ritual_type, "completed_at": r.completed_at.isoformat()} for r in rituals],
+        "desire_text": desire_text
+    }
+
 
 @api_router.post("/rituals/complete")
+@query_budget(queries=1, commits=1)
 async def complete_ritual(ritual_data: RitualCompleteRequest, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     ritual = RitualCompletionModel(
         id=str(uuid.uuid4()),
         user_id=user_id,
         ritual_type=ritual_data.ritual_type,
-        completed_at=datetime.fromisoformat(ritual_data.completed_at.replace('Z', '+00:00'))
+        completed_at=ritual_data.completed_at
     )
     db.add(ritual)
     await db.commit()
     return {"message": "Ritual completed", "id": ritual.id}
 
 @api_router.get("/rituals/completed")
+@query_budget(queries=1, commits=0)
 async def get_completed_rituals(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(RitualCompletionModel)
@@ -927,25 +2440,23 @@ async def get_completed_rituals(user_id: str = Depends(get_current_user), db: As
 
 
 @api_router.post("/wisdom/favorites")
+@query_budget(queries=1, commits=1)
 async def add_wisdom_favorite(favorite_data: WisdomFavoriteCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(WisdomFavoriteModel)
-        .where(WisdomFavoriteModel.user_id == user_id, WisdomFavoriteModel.quote_id == favorite_data.quote_id)
-    )
-    existing = result.scalar_one_or_none()
-    if existing:
-        raise HTTPException(status_code=400, detail="Already in favorites")
-    
     favorite = WisdomFavoriteModel(
         id=str(uuid.uuid4()),
         user_id=user_id,
         quote_id=favorite_data.quote_id
     )
     db.add(favorite)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Already in favorites")
     return {"message": "Added to favorites", "id": favorite.id}
 
 @api_router.get("/wisdom/favorites")
+@query_budget(queries=1, commits=0)
 async def get_wisdom_favorites(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(WisdomFavoriteModel)
@@ -956,6 +2467,7 @@ async def get_wisdom_favorites(user_id: str = Depends(get_current_user), db: Asy
     return [{"id": f.id, "user_id": f.user_id, "quote_id": f.quote_id, "created_at": f.created_at.isoformat()} for f in favorites]
 
 @api_router.delete("/wisdom/favorites/{quote_id}")
+@query_budget(queries=3, commits=1)
 async def remove_wisdom_favorite(quote_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(WisdomFavoriteModel)
@@ -965,10 +2477,12 @@ async def remove_wisdom_favorite(quote_id: str, user_id: str = Depends(get_curre
     if not favorite:
         raise HTTPException(status_code=404, detail="Favorite not found")
     await db.delete(favorite)
+    record_tombstone(db, user_id, "wisdom_favorites", favorite.id)
     await db.commit()
     return {"message": "Removed from favorites"}
 
 @api_router.post("/wisdom/notifications")
+@query_budget(queries=2, commits=1)
 async def update_wisdom_notifications(prefs: WisdomNotificationPreference, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(UserModel).where(UserModel.id == user_id))
     user = result.scalar_one_or_none()
@@ -979,6 +2493,7 @@ async def update_wisdom_notifications(prefs: WisdomNotificationPreference, user_
 
 
 @api_router.post("/identity/statements", response_model=IdentityStatement)
+@query_budget(queries=1, commits=1)
 async def create_identity_statement(data: IdentityStatementCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     identity = IdentityStatementModel(
         id=str(uuid.uuid4()),
@@ -988,16 +2503,21 @@ async def create_identity_statement(data: IdentityStatementCreate, user_id: str
     )
     db.add(identity)
     await db.commit()
-    await db.refresh(identity)
+    await invalidate_cached_response(user_id, "identity_statements")
     return IdentityStatement.model_validate(identity)
 
 @api_router.get("/identity/statements", response_model=List[IdentityStatement])
-async def get_identity_statements(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@query_budget(queries=1, commits=0)
+async def get_identity_statements(request: Request, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    cached = await get_cached_response(request, user_id, "identity_statements")
+    if cached is not None:
+        return cached
     result = await db.execute(select(IdentityStatementModel).where(IdentityStatementModel.user_id == user_id))
     statements = result.scalars().all()
-    return [IdentityStatement.model_validate(s) for s in statements]
+    return await cache_response(request, user_id, "identity_statements", dump_json(List[IdentityStatement], statements))
 
 @api_router.post("/identity/evidence", response_model=IdentityEvidence)
+@query_budget(queries=3, commits=1)
 async def add_identity_evidence(data: IdentityEvidenceCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     evidence = IdentityEvidenceModel(
         id=str(uuid.uuid4()),
@@ -1007,41 +2527,41 @@ async def add_identity_evidence(data: IdentityEvidenceCreate, user_id: str = Dep
         date=datetime.now(timezone.utc).date().isoformat()
     )
     db.add(evidence)
-    await db.commit()
     
-    count_result = await db.execute(
+    evidence_count = (
         select(func.count()).select_from(IdentityEvidenceModel)
         .where(IdentityEvidenceModel.user_id == user_id, IdentityEvidenceModel.identity_id == data.identity_id)
+        .scalar_subquery()
     )
-    evidence_count = count_result.scalar()
-    strength_score = min(100, evidence_count * 2)
-    
-    stmt_result = await db.execute(
-        select(IdentityStatementModel)
+    await db.execute(
+        update(IdentityStatementModel)
         .where(IdentityStatementModel.id == data.identity_id, IdentityStatementModel.user_id == user_id)
+        .values(
+            evidence_count=evidence_count,
+            strength_score=case((evidence_count * 2 > 100, 100), else_=evidence_count * 2),
+            updated_at=datetime.now(timezone.utc)
+        )
+        .execution_options(synchronize_session=False)
     )
-    statement = stmt_result.scalar_one_or_none()
-    if statement:
-        statement.evidence_count = evidence_count
-        statement.strength_score = strength_score
-        statement.updated_at = datetime.now(timezone.utc)
-        await db.commit()
-    
-    await db.refresh(evidence)
+    await index_search_documents(db, user_id, "evidence", [(evidence.id, evidence.evidence_text)])
+    await db.commit()
+    await invalidate_cached_response(user_id, "identity_statements")
     return IdentityEvidence.model_validate(evidence)
 
 @api_router.get("/identity/evidence/{identity_id}")
-async def get_identity_evidence(identity_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
+@query_budget(queries=1, commits=0)
+async def get_identity_evidence(identity_id: str, response: Response, date_from: Optional[str] = None, date_to: Optional[str] = None, page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = filter_date_range(
         select(IdentityEvidenceModel)
-        .where(IdentityEvidenceModel.user_id == user_id, IdentityEvidenceModel.identity_id == identity_id)
-        .order_by(IdentityEvidenceModel.created_at.desc())
+        .where(IdentityEvidenceModel.user_id == user_id, IdentityEvidenceModel.identity_id == identity_id),
+        IdentityEvidenceModel.date, date_from, date_to
     )
-    evidence_list = result.scalars().all()
+    evidence_list = await fetch_page(db, query, IdentityEvidenceModel.created_at, IdentityEvidenceModel.id, page, response)
     return [{"id": e.id, "user_id": e.user_id, "identity_id": e.identity_id, "evidence_text": e.evidence_text, "date": e.date, "created_at": e.created_at.isoformat()} for e in evidence_list]
 
 
 @api_router.post("/obstacles", response_model=Obstacle)
+@query_budget(queries=2, commits=1)
 async def create_obstacle(data: ObstacleCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     obstacle = ObstacleModel(
         id=str(uuid.uuid4()),
@@ -1049,21 +2569,22 @@ async def create_obstacle(data: ObstacleCreate, user_id: str = Depends(get_curre
         obstacle_text=data.obstacle_text
     )
     db.add(obstacle)
+    await index_search_documents(db, user_id, "obstacle", [(obstacle.id, obstacle.obstacle_text)])
     await db.commit()
-    await db.refresh(obstacle)
+    await publish_event(user_id, "obstacle.created", id=obstacle.id, status=obstacle.status)
     return Obstacle.model_validate(obstacle)
 
 @api_router.get("/obstacles", response_model=List[Obstacle])
-async def get_obstacles(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(ObstacleModel)
-        .where(ObstacleModel.user_id == user_id)
-        .order_by(ObstacleModel.created_at.desc())
-    )
-    obstacles = result.scalars().all()
-    return [Obstacle.model_validate(o) for o in obstacles]
+@query_budget(queries=1, commits=0)
+async def get_obstacles(response: Response, obstacle_status: Optional[str] = Query(None, alias="status"), page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = select(ObstacleModel).where(ObstacleModel.user_id == user_id)
+    if obstacle_status:
+        query = query.where(ObstacleModel.status == obstacle_status)
+    obstacles = await fetch_page(db, query, ObstacleModel.created_at, ObstacleModel.id, page, response)
+    return json_response(List[Obstacle], obstacles, response)
 
 @api_router.put("/obstacles/{obstacle_id}", response_model=Obstacle)
+@query_budget(queries=4, commits=1)
 async def update_obstacle(obstacle_id: str, data: ObstacleUpdate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(ObstacleModel).where(ObstacleModel.id == obstacle_id, ObstacleModel.user_id == user_id))
     obstacle = result.scalar_one_or_none()
@@ -1085,22 +2606,28 @@ async def update_obstacle(obstacle_id: str, data: ObstacleUpdate, user_id: str =
     for key, value in update_data.items():
         setattr(obstacle, key, value)
     
+    await index_search_documents(db, user_id, "obstacle", [(obstacle.id, obstacle_search_text(obstacle))], replace=True)
     await db.commit()
-    await db.refresh(obstacle)
+    await publish_event(user_id, "obstacle.updated", id=obstacle.id, status=obstacle.status, transformed_at=obstacle.transformed_at)
     return Obstacle.model_validate(obstacle)
 
 @api_router.delete("/obstacles/{obstacle_id}")
+@query_budget(queries=4, commits=1)
 async def delete_obstacle(obstacle_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(ObstacleModel).where(ObstacleModel.id == obstacle_id, ObstacleModel.user_id == user_id))
     obstacle = result.scalar_one_or_none()
     if not obstacle:
         raise HTTPException(status_code=404, detail="Obstacle not found")
     await db.delete(obstacle)
+    record_tombstone(db, user_id, "obstacles", obstacle.id)
+    await remove_search_document(db, "obstacle", obstacle.id)
     await db.commit()
+    await publish_event(user_id, "obstacle.deleted", id=obstacle_id)
     return {"message": "Obstacle deleted"}
 
 
 @api_router.post("/burning-desire", response_model=BurningDesire)
+@query_budget(queries=2, commits=1)
 async def create_burning_desire(data: BurningDesireCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(BurningDesireModel).where(BurningDesireModel.user_id == user_id))
     existing = result.scalar_one_or_none()
@@ -1112,7 +2639,7 @@ async def create_burning_desire(data: BurningDesireCreate, user_id: str = Depend
         existing.intensity = data.intensity
         existing.updated_at = datetime.now(timezone.utc)
         await db.commit()
-        await db.refresh(existing)
+        await invalidate_cached_response(user_id, "burning_desire")
         return BurningDesire.model_validate(existing)
     else:
         desire = BurningDesireModel(
@@ -1125,18 +2652,23 @@ async def create_burning_desire(data: BurningDesireCreate, user_id: str = Depend
         )
         db.add(desire)
         await db.commit()
-        await db.refresh(desire)
+        await invalidate_cached_response(user_id, "burning_desire")
         return BurningDesire.model_validate(desire)
 
 @api_router.get("/burning-desire", response_model=BurningDesire)
-async def get_burning_desire(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@query_budget(queries=1, commits=0)
+async def get_burning_desire(request: Request, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    cached = await get_cached_response(request, user_id, "burning_desire")
+    if cached is not None:
+        return cached
     result = await db.execute(select(BurningDesireModel).where(BurningDesireModel.user_id == user_id))
     desire = result.scalar_one_or_none()
     if not desire:
         raise HTTPException(status_code=404, detail="No burning desire set")
-    return BurningDesire.model_validate(desire)
+    return await cache_response(request, user_id, "burning_desire", dump_json(BurningDesire, desire))
 
 @api_router.post("/burning-desire/visualizations")
+@query_budget(queries=1, commits=1)
 async def create_visualization(data: DesireVisualizationCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     viz = DesireVisualizationModel(
         id=str(uuid.uuid4()),
@@ -1152,6 +2684,7 @@ async def create_visualization(data: DesireVisualizationCreate, user_id: str = D
     return {"id": viz.id, "user_id": viz.user_id, "desire_id": viz.desire_id, "intensity_rating": viz.intensity_rating, "emotion": viz.emotion, "notes": viz.notes, "date": viz.date, "created_at": viz.created_at.isoformat()}
 
 @api_router.get("/burning-desire/visualizations")
+@query_budget(queries=1, commits=0)
 async def get_visualizations(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(DesireVisualizationModel)
@@ -1164,6 +2697,7 @@ async def get_visualizations(user_id: str = Depends(get_current_user), db: Async
 
 
 @api_router.post("/premeditatio", response_model=PremeditatioPractice)
+@query_budget(queries=1, commits=1)
 async def create_premeditatio(data: PremeditatioPracticeCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     practice = PremeditatioPracticeModel(
         id=str(uuid.uuid4()),
@@ -1175,38 +2709,37 @@ async def create_premeditatio(data: PremeditatioPracticeCreate, user_id: str = D
     )
     db.add(practice)
     await db.commit()
-    await db.refresh(practice)
     return PremeditatioPractice.model_validate(practice)
 
 @api_router.get("/premeditatio", response_model=List[PremeditatioPractice])
-async def get_premeditatio_practices(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(PremeditatioPracticeModel)
-        .where(PremeditatioPracticeModel.user_id == user_id)
-        .order_by(PremeditatioPracticeModel.created_at.desc())
-    )
-    practices = result.scalars().all()
-    return [PremeditatioPractice.model_validate(p) for p in practices]
+@query_budget(queries=1, commits=0)
+async def get_premeditatio_practices(response: Response, date_from: Optional[str] = None, date_to: Optional[str] = None, page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = filter_date_range(select(PremeditatioPracticeModel).where(PremeditatioPracticeModel.user_id == user_id), PremeditatioPracticeModel.date, date_from, date_to)
+    practices = await fetch_page(db, query, PremeditatioPracticeModel.created_at, PremeditatioPracticeModel.id, page, response)
+    return json_response(List[PremeditatioPractice], practices, response)
 
 @api_router.put("/premeditatio/{practice_id}", response_model=PremeditatioPractice)
+@query_budget(queries=1, commits=1)
 async def update_premeditatio(practice_id: str, data: PremeditatioPracticeUpdate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(PremeditatioPracticeModel).where(PremeditatioPracticeModel.id == practice_id, PremeditatioPracticeModel.user_id == user_id))
-    practice = result.scalar_one_or_none()
-    if not practice:
-        raise HTTPException(status_code=404, detail="Practice not found")
-    
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     update_data['updated_at'] = datetime.now(timezone.utc)
     
-    for key, value in update_data.items():
-        setattr(practice, key, value)
+    result = await db.execute(
+        update(PremeditatioPracticeModel)
+        .where(PremeditatioPracticeModel.id == practice_id, PremeditatioPracticeModel.user_id == user_id)
+        .values(**update_data)
+        .returning(PremeditatioPracticeModel)
+    )
+    practice = result.scalar_one_or_none()
+    if not practice:
+        raise HTTPException(status_code=404, detail="Practice not found")
     
     await db.commit()
-    await db.refresh(practice)
     return PremeditatioPractice.model_validate(practice)
 
 
 @api_router.post("/habit-stacking", response_model=HabitChain)
+@query_budget(queries=1, commits=1)
 async def create_habit_chain(data: HabitChainCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     chain = HabitChainModel(
         id=str(uuid.uuid4()),
@@ -1218,53 +2751,67 @@ async def create_habit_chain(data: HabitChainCreate, user_id: str = Depends(get_
     )
     db.add(chain)
     await db.commit()
-    await db.refresh(chain)
+    await invalidate_cached_response(user_id, "habit_chains")
     return HabitChain.model_validate(chain)
 
 @api_router.get("/habit-stacking", response_model=List[HabitChain])
-async def get_habit_chains(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@query_budget(queries=1, commits=0)
+async def get_habit_chains(request: Request, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    cached = await get_cached_response(request, user_id, "habit_chains")
+    if cached is not None:
+        return cached
     result = await db.execute(select(HabitChainModel).where(HabitChainModel.user_id == user_id))
     chains = result.scalars().all()
-    return [HabitChain.model_validate(c) for c in chains]
+    return await cache_response(request, user_id, "habit_chains", dump_json(List[HabitChain], chains))
 
 @api_router.post("/habit-stacking/{chain_id}/complete")
+@query_budget(queries=2, commits=1)
 async def complete_habit_chain(chain_id: str, data: HabitChainCompletionData, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(HabitChainModel).where(HabitChainModel.id == chain_id, HabitChainModel.user_id == user_id))
-    chain = result.scalar_one_or_none()
-    if not chain:
+    success = 1 if data.success else 0
+    result = await db.execute(
+        update(HabitChainModel)
+        .where(HabitChainModel.id == chain_id, HabitChainModel.user_id == user_id)
+        .values(
+            total_attempts=HabitChainModel.total_attempts + 1,
+            success_count=HabitChainModel.success_count + success,
+            chain_strength=(HabitChainModel.success_count + success) * 100 // (HabitChainModel.total_attempts + 1),
+            updated_at=datetime.now(timezone.utc)
+        )
+        .returning(HabitChainModel.chain_strength, HabitChainModel.success_count, HabitChainModel.total_attempts)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="Chain not found")
     
-    completion = HabitChainCompletionModel(
+    db.add(HabitChainCompletionModel(
         id=str(uuid.uuid4()),
         user_id=user_id,
         chain_id=chain_id,
         success=data.success,
         date=datetime.now(timezone.utc).date().isoformat()
-    )
-    db.add(completion)
-    
-    chain.total_attempts = (chain.total_attempts or 0) + 1
-    if data.success:
-        chain.success_count = (chain.success_count or 0) + 1
-    
-    chain.chain_strength = int((chain.success_count / chain.total_attempts) * 100) if chain.total_attempts > 0 else 0
-    chain.updated_at = datetime.now(timezone.utc)
-    
+    ))
     await db.commit()
-    return {"message": "Chain completion recorded", "chain_strength": chain.chain_strength}
+    await invalidate_cached_response(user_id, "habit_chains")
+    await publish_event(user_id, "habit_chain.completed", id=chain_id, success=data.success, chain_strength=row.chain_strength)
+    return {"message": "Chain completion recorded", "chain_strength": row.chain_strength, "success_count": row.success_count, "total_attempts": row.total_attempts}
 
 @api_router.delete("/habit-stacking/{chain_id}")
+@query_budget(queries=3, commits=1)
 async def delete_habit_chain(chain_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(HabitChainModel).where(HabitChainModel.id == chain_id, HabitChainModel.user_id == user_id))
     chain = result.scalar_one_or_none()
     if not chain:
         raise HTTPException(status_code=404, detail="Chain not found")
     await db.delete(chain)
+    record_tombstone(db, user_id, "habit_chains", chain.id)
     await db.commit()
+    await invalidate_cached_response(user_id, "habit_chains")
     return {"message": "Chain deleted"}
 
 
 @api_router.post("/two-minute-rule", response_model=TwoMinuteRule)
+@query_budget(queries=1, commits=1)
 async def create_two_minute_rule(data: TwoMinuteRuleCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     rule = TwoMinuteRuleModel(
         id=str(uuid.uuid4()),
@@ -1274,46 +2821,66 @@ async def create_two_minute_rule(data: TwoMinuteRuleCreate, user_id: str = Depen
     )
     db.add(rule)
     await db.commit()
-    await db.refresh(rule)
     return TwoMinuteRule.model_validate(rule)
 
 @api_router.get("/two-minute-rule", response_model=List[TwoMinuteRule])
+@query_budget(queries=2, commits=0)
 async def get_two_minute_rules(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(TwoMinuteRuleModel).where(TwoMinuteRuleModel.user_id == user_id))
     rules = result.scalars().all()
-    return [TwoMinuteRule.model_validate(r) for r in rules]
+    completion_dates = await load_completion_dates(db, user_id, [r.id for r in rules], TwoMinuteRuleCompletionModel.rule_id)
+    return json_response(List[TwoMinuteRule], [TwoMinuteRule.model_validate(r).model_copy(update={"completion_dates": completion_dates[r.id]}) for r in rules])
 
 @api_router.post("/two-minute-rule/{rule_id}/complete")
+@query_budget(queries=2, commits=1)
 async def complete_two_minute_rule(rule_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(TwoMinuteRuleModel).where(TwoMinuteRuleModel.id == rule_id, TwoMinuteRuleModel.user_id == user_id))
-    rule = result.scalar_one_or_none()
-    if not rule:
-        raise HTTPException(status_code=404, detail="Rule not found")
-    
     today = datetime.now(timezone.utc).date().isoformat()
-    completion_dates = list(rule.completion_dates or [])
-    
-    if today not in completion_dates:
-        completion_dates.append(today)
-        rule.completion_dates = completion_dates
-        rule.graduation_level = min(5, len(completion_dates) // 7)
-        rule.updated_at = datetime.now(timezone.utc)
-        await db.commit()
+    new_count = TwoMinuteRuleModel.completion_count + 1
+    result = await db.execute(
+        update(TwoMinuteRuleModel)
+        .where(
+            TwoMinuteRuleModel.id == rule_id,
+            TwoMinuteRuleModel.user_id == user_id,
+            or_(TwoMinuteRuleModel.last_completed.is_(None), TwoMinuteRuleModel.last_completed != today)
+        )
+        .values(
+            completion_count=new_count,
+            last_completed=today,
+            graduation_level=case((new_count // 7 > 5, 5), else_=new_count // 7),
+            updated_at=datetime.now(timezone.utc)
+        )
+        .returning(TwoMinuteRuleModel.graduation_level)
+        .execution_options(synchronize_session=False)
+    )
+    graduation_level = result.scalar_one_or_none()
+    if graduation_level is None:
+        result = await db.execute(select(TwoMinuteRuleModel.graduation_level).where(TwoMinuteRuleModel.id == rule_id, TwoMinuteRuleModel.user_id == user_id))
+        graduation_level = result.scalar_one_or_none()
+        if graduation_level is None:
+            raise HTTPException(status_code=404, detail="Rule not found")
+        return {"message": "Rule completed", "graduation_level": graduation_level}
     
-    return {"message": "Rule completed", "graduation_level": rule.graduation_level}
+    db.add(TwoMinuteRuleCompletionModel(id=str(uuid.uuid4()), rule_id=rule_id, user_id=user_id, date=today))
+    await db.commit()
+    await publish_event(user_id, "two_minute_rule.completed", id=rule_id, date=today, graduation_level=graduation_level)
+    return {"message": "Rule completed", "graduation_level": graduation_level}
 
 @api_router.delete("/two-minute-rule/{rule_id}")
+@query_budget(queries=4, commits=1)
 async def delete_two_minute_rule(rule_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(TwoMinuteRuleModel).where(TwoMinuteRuleModel.id == rule_id, TwoMinuteRuleModel.user_id == user_id))
     rule = result.scalar_one_or_none()
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
+    await db.execute(delete(TwoMinuteRuleCompletionModel).where(TwoMinuteRuleCompletionModel.rule_id == rule.id))
     await db.delete(rule)
+    record_tombstone(db, user_id, "two_minute_rules", rule.id)
     await db.commit()
     return {"message": "Rule deleted"}
 
 
 @api_router.post("/mastermind/members")
+@query_budget(queries=1, commits=1)
 async def create_mastermind_member(data: MastermindMemberCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     member = MastermindMemberModel(
         id=str(uuid.uuid4()),
@@ -1325,25 +2892,34 @@ async def create_mastermind_member(data: MastermindMemberCreate, user_id: str =
     )
     db.add(member)
     await db.commit()
+    await invalidate_cached_response(user_id, "mastermind_members")
     return {"id": member.id, "user_id": member.user_id, "name": member.name, "expertise": member.expertise, "contribution": member.contribution, "is_virtual": member.is_virtual, "created_at": member.created_at.isoformat()}
 
 @api_router.get("/mastermind/members")
-async def get_mastermind_members(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+@query_budget(queries=1, commits=0)
+async def get_mastermind_members(request: Request, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    cached = await get_cached_response(request, user_id, "mastermind_members")
+    if cached is not None:
+        return cached
     result = await db.execute(select(MastermindMemberModel).where(MastermindMemberModel.user_id == user_id))
     members = result.scalars().all()
-    return [{"id": m.id, "user_id": m.user_id, "name": m.name, "expertise": m.expertise, "contribution": m.contribution, "is_virtual": m.is_virtual, "created_at": m.created_at.isoformat()} for m in members]
+    return await cache_response(request, user_id, "mastermind_members", dump_json(List[Dict[str, Any]], [{"id": m.id, "user_id": m.user_id, "name": m.name, "expertise": m.expertise, "contribution": m.contribution, "is_virtual": m.is_virtual, "created_at": m.created_at.isoformat()} for m in members]))
 
 @api_router.delete("/mastermind/members/{member_id}")
+@query_budget(queries=3, commits=1)
 async def delete_mastermind_member(member_id: str, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(MastermindMemberModel).where(MastermindMemberModel.id == member_id, MastermindMemberModel.user_id == user_id))
     member = result.scalar_one_or_none()
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
     await db.delete(member)
+    record_tombstone(db, user_id, "mastermind_members", member.id)
     await db.commit()
+    await invalidate_cached_response(user_id, "mastermind_members")
     return {"message": "Member deleted"}
 
 @api_router.post("/mastermind/meetings")
+@query_budget(queries=2, commits=1)
 async def create_mastermind_meeting(data: MastermindMeetingCreate, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     meeting = MastermindMeetingModel(
         id=str(uuid.uuid4()),
@@ -1355,36 +2931,687 @@ async def create_mastermind_meeting(data: MastermindMeetingCreate, user_id: str
         date=datetime.now(timezone.utc).date().isoformat()
     )
     db.add(meeting)
+    await index_search_documents(db, user_id, "mastermind", [(meeting.id, meeting.insights)])
     await db.commit()
     return {"id": meeting.id, "user_id": meeting.user_id, "member_id": meeting.member_id, "topic": meeting.topic, "insights": meeting.insights, "action_items": meeting.action_items, "date": meeting.date, "created_at": meeting.created_at.isoformat()}
 
 @api_router.get("/mastermind/meetings")
-async def get_mastermind_meetings(user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(MastermindMeetingModel)
-        .where(MastermindMeetingModel.user_id == user_id)
-        .order_by(MastermindMeetingModel.created_at.desc())
-    )
-    meetings = result.scalars().all()
+@query_budget(queries=1, commits=0)
+async def get_mastermind_meetings(response: Response, member_id: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None, page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = filter_date_range(select(MastermindMeetingModel).where(MastermindMeetingModel.user_id == user_id), MastermindMeetingModel.date, date_from, date_to)
+    if member_id:
+        query = query.where(MastermindMeetingModel.member_id == member_id)
+    meetings = await fetch_page(db, query, MastermindMeetingModel.created_at, MastermindMeetingModel.id, page, response)
     return [{"id": m.id, "user_id": m.user_id, "member_id": m.member_id, "topic": m.topic, "insights": m.insights, "action_items": m.action_items, "date": m.date, "created_at": m.created_at.isoformat()} for m in meetings]
 
 
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+EXPORT_MODELS = [
+    GoalModel, HabitModel, HabitCompletionModel, JournalEntryModel, ExerciseModel, RitualCompletionModel,
+    WisdomFavoriteModel, VisionBoardItemModel, IdentityStatementModel, IdentityEvidenceModel, ObstacleModel,
+    BurningDesireModel, DesireVisualizationModel, PremeditatioPracticeModel, HabitChainModel, HabitChainCompletionModel,
+    TwoMinuteRuleModel, TwoMinuteRuleCompletionModel, MastermindMemberModel, MastermindMeetingModel
+]
+
+async def export_user_rows(user_id: str, compress: bool):
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    start = time.perf_counter()
+    total = 0
+    header = {"table": "export", "data": {"user_id": user_id, "schema_version": SCHEMA_VERSION, "exported_at": datetime.now(timezone.utc)}}
+    chunk = orjson.dumps(header) + b"\n"
+    yield compressor.compress(chunk) if compressor else chunk
+    async with async_session() as session:
+        if engine.dialect.name == "postgresql":
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        for model in EXPORT_MODELS:
+            table = model.__table__
+            result = await session.stream(select(table).where(table.c.user_id == user_id).execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                chunk = b"".join(orjson.dumps({"table": table.name, "data": row._asdict()}) + b"\n" for row in rows)
+                export_rows.inc((table.name,), len(rows))
+                total += len(rows)
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                yield chunk
+    if compressor:
+        yield compressor.flush()
+    elapsed = time.perf_counter() - start
+    logger.info(f"Exported {total} rows for user {user_id} in {elapsed:.2f}s ({total / elapsed:.0f} rows/s)")
+
+@api_router.get("/export")
+@query_budget(queries=len(EXPORT_MODELS), commits=0)
+async def export_data(compress: bool = Query(False, alias="gzip"), user_id: str = Depends(get_current_user)):
+    filename = "growth-export.ndjson.gz" if compress else "growth-export.ndjson"
+    return StreamingResponse(
+        export_user_rows(user_id, compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', '5'))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', '90'))
+SYNC_MODELS = [
+    GoalModel, HabitModel, JournalEntryModel, ExerciseModel, RitualCompletionModel, WisdomFavoriteModel,
+    VisionBoardItemModel, IdentityStatementModel, IdentityEvidenceModel, ObstacleModel, BurningDesireModel,
+    DesireVisualizationModel, PremeditatioPracticeModel, HabitChainModel, TwoMinuteRuleModel,
+    MastermindMemberModel, MastermindMeetingModel
+]
+SYNC_COMPLETION_COLUMNS = {
+    "habits": HabitCompletionModel.habit_id,
+    "two_minute_rules": TwoMinuteRuleCompletionModel.rule_id,
+}
+
+def record_tombstone(db: AsyncSession, user_id: str, entity: str, entity_id: str):
+    db.add(TombstoneModel(user_id=user_id, entity=entity, entity_id=entity_id))
+
+def encode_sync_token(synced_at: datetime) -> str:
+    return base64.urlsafe_b64encode(synced_at.isoformat().encode()).decode().rstrip("=")
+
+def decode_sync_token(token: str) -> datetime:
+    try:
+        synced_at = datetime.fromisoformat(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    if synced_at.tzinfo is None:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    return synced_at
+
+@api_router.get("/sync")
+@query_budget(queries=len(SYNC_MODELS) + len(SYNC_COMPLETION_COLUMNS) + 1, commits=0)
+async def sync_changes(since: Optional[str] = None, user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    synced_at = datetime.now(timezone.utc)
+    window_start = None
+    if since:
+        window_start = decode_sync_token(since) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        if window_start < synced_at - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS):
+            window_start = None
+
+    changes = {}
+    for model in SYNC_MODELS:
+        table = model.__table__
+        query = select(table).where(table.c.user_id == user_id)
+        if window_start is not None:
+            query = query.where(table.c.updated_at >= window_start)
+        rows = [row._asdict() for row in (await db.execute(query)).all()]
+        if rows:
+            changes[table.name] = rows
+    for entity, parent_col in SYNC_COMPLETION_COLUMNS.items():
+        rows = changes.get(entity, [])
+        completion_dates = await load_completion_dates(db, user_id, [row["id"] for row in rows], parent_col)
+        for row in rows:
+            row["completion_dates"] = completion_dates[row["id"]]
+
+    deleted = {}
+    if window_start is not None:
+        result = await db.execute(
+            select(TombstoneModel.entity, TombstoneModel.entity_id)
+            .where(TombstoneModel.user_id == user_id, TombstoneModel.deleted_at >= window_start)
+        )
+        for entity, entity_id in result.all():
+            deleted.setdefault(entity, []).append(entity_id)
+
+    mode = "full" if window_start is None else "delta"
+    sync_rows.inc((mode,), sum(len(rows) for rows in changes.values()) + sum(len(ids) for ids in deleted.values()))
+    return ORJSONResponse({"token": encode_sync_token(synced_at), "full": window_start is None, "changes": changes, "deleted": deleted})
+
+
+SEARCH_SOURCES = ("journal", "obstacle", "mastermind", "evidence")
+
+def obstacle_search_text(obstacle) -> str:
+    return " ".join(part for part in (obstacle.obstacle_text, obstacle.perception, obstacle.action, obstacle.will) if part)
+
+async def index_search_documents(db: AsyncSession, user_id: str, source: str, documents: List[Tuple[str, str]], replace: bool = False):
+    if not documents:
+        return
+    now = datetime.now(timezone.utc)
+    params = [{"source": source, "source_id": source_id, "user_id": user_id, "body": body, "created_at": now} for source_id, body in documents]
+    insert_sql = "INSERT INTO search_documents (source, source_id, user_id, body, created_at) VALUES (:source, :source_id, :user_id, :body, :created_at)"
+    if engine.dialect.name == "postgresql":
+        await db.execute(text(insert_sql + " ON CONFLICT (source, source_id) DO UPDATE SET body = EXCLUDED.body"), params)
+        return
+    if replace:
+        await db.execute(text("DELETE FROM search_documents WHERE source = :source AND source_id = :source_id"), params)
+    await db.execute(text(insert_sql), params)
+
+async def remove_search_document(db: AsyncSession, source: str, source_id: str):
+    await db.execute(text("DELETE FROM search_documents WHERE source = :source AND source_id = :source_id"), {"source": source, "source_id": source_id})
+
+def search_statement(sources_filter: bool, keyset: bool):
+    if engine.dialect.name == "postgresql":
+        sql = (
+            "SELECT source, source_id, created_at, score, "
+            "ts_headline('english', body, query, 'StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8, MaxFragments=2') AS snippet "
+            "FROM (SELECT d.source, d.source_id, d.created_at, d.body, q.query, ts_rank(d.document, q.query) AS score "
+            "FROM search_documents d, websearch_to_tsquery('english', :q) AS q(query) "
+            "WHERE d.user_id = :user_id AND d.document @@ q.query"
+            + (" AND d.source IN :sources" if sources_filter else "")
+            + (" AND (ts_rank(d.document, q.query) < CAST(:score AS REAL) OR (ts_rank(d.document, q.query) = CAST(:score AS REAL) AND d.source_id > :after_id))" if keyset else "")
+            + " ORDER BY score DESC, d.source_id LIMIT :limit) page ORDER BY score DESC, source_id"
+        )
+    else:
+        sql = (
+            "SELECT source, source_id, created_at, score, snippet FROM ("
+            "SELECT source, source_id, created_at, -bm25(search_documents) AS score, "
+            "snippet(search_documents, 0, '<mark>', '</mark>', '...', 24) AS snippet "
+            "FROM search_documents WHERE search_documents MATCH :q AND user_id = :user_id"
+            + (" AND source IN :sources" if sources_filter else "")
+            + ")"
+            + (" WHERE score < :score OR (score = :score AND source_id > :after_id)" if keyset else "")
+            + " ORDER BY score DESC, source_id LIMIT :limit"
+        )
+    statement = text(sql)
+    if sources_filter:
+        statement = statement.bindparams(bindparam("sources", expanding=True))
+    return statement
+
+def fts5_query(q: str) -> str:
+    return " ".join('"%s"' % term for term in re.findall(r"\w+", q))
+
+@api_router.get("/search")
+@query_budget(queries=1, commits=0)
+async def search(response: Response, q: str = Query(..., min_length=1, max_length=500), sources: Optional[str] = None, page: PageParams = Depends(), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    source_list = [source.strip() for source in sources.split(",") if source.strip()] if sources else []
+    unknown = [source for source in source_list if source not in SEARCH_SOURCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search sources: {', '.join(unknown)}")
+    query_text = q if engine.dialect.name == "postgresql" else fts5_query(q)
+    if not query_text:
+        return []
+
+    params = {"q": query_text, "user_id": user_id, "limit": page.limit + 1}
+    if source_list:
+        params["sources"] = source_list
+    if page.cursor:
+        params["score"], params["after_id"] = decode_cursor(page.cursor, column("score", Float))
+    rows = (await db.execute(search_statement(bool(source_list), bool(page.cursor)), params)).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].score, rows[-1].source_id)
+    return [
+        {
+            "source": row.source,
+            "id": row.source_id,
+            "score": row.score,
+            "snippet": row.snippet,
+            "created_at": (row.created_at if isinstance(row.created_at, datetime) else datetime.fromisoformat(row.created_at)).isoformat()
+        }
+        for row in rows
+    ]
+
+
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '1000'))
+IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', '100'))
+
+async def iter_lines(stream):
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+async def iter_import_records(stream, import_format: str):
+    line_no = 0
+    if import_format == "ndjson":
+        async for raw in iter_lines(stream):
+            line_no += 1
+            if not raw.strip():
+                continue
+            try:
+                row = orjson.loads(raw)
+            except orjson.JSONDecodeError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, row, None
+        return
+
+    header = None
+    record: List[str] = []
+    start = 0
+    async for raw in iter_lines(stream):
+        line_no += 1
+        if not record:
+            start = line_no
+        record.append(raw.decode("utf-8-sig" if line_no == 1 else "utf-8", errors="replace").rstrip("\r"))
+        if sum(line.count('"') for line in record) % 2:
+            continue
+        values = next(csv.reader(["\n".join(record)]), [])
+        record = []
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        if not any(value.strip() for value in values):
+            continue
+        row = {name: value for name, value in zip(header, values) if value != ""}
+        if "gratitude" in row:
+            row["gratitude"] = [item.strip() for item in row["gratitude"].split(";") if item.strip()]
+        yield start, row, None
+    if record:
+        yield start, None, "Unterminated quoted field"
+
+def format_validation_error(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+def validate_import_batch(batch: List[Tuple[int, Dict[str, Any]]], report: Dict[str, Any]) -> List[Tuple[int, Any]]:
+    try:
+        rows = type_adapter(List[ImportRow]).validate_python([row for _, row in batch])
+        return [(line_no, row) for (line_no, _), row in zip(batch, rows)]
+    except ValidationError:
+        pass
+    valid = []
+    for line_no, row in batch:
+        try:
+            valid.append((line_no, type_adapter(ImportRow).validate_python(row)))
+        except ValidationError as e:
+            add_import_error(report, line_no, format_validation_error(e))
+    return valid
+
+def add_import_error(report: Dict[str, Any], line_no: int, message: str):
+    report["error_count"] += 1
+    if len(report["errors"]) < IMPORT_MAX_ERRORS:
+        report["errors"].append({"line": line_no, "error": message})
+
+async def import_batch(db: AsyncSession, user_id: str, batch: List[Tuple[int, Dict[str, Any]]], habit_ids: Dict[str, str], touched_habits: set, report: Dict[str, Any]):
+    now = datetime.now(timezone.utc)
+    journal_rows, new_habits, completions = [], [], []
+    for line_no, row in validate_import_batch(batch, report):
+        if row.kind == "journal":
+            journal_rows.append({"id": str(uuid.uuid4()), "user_id": user_id, "content": row.content, "mood": row.mood, "gratitude": row.gratitude, "date": row.date, "created_at": now})
+            continue
+        habit_id = habit_ids.get(row.name)
+        if habit_id is None:
+            habit_id = habit_ids[row.name] = str(uuid.uuid4())
+            new_habits.append({"id": habit_id, "user_id": user_id, "name": row.name, "description": row.description, "frequency": row.frequency, "created_at": now})
+        completions.append({"id": str(uuid.uuid4()), "habit_id": habit_id, "user_id": user_id, "date": row.date, "created_at": now})
+
+    if completions:
+        existing = set((await db.execute(
+            select(HabitCompletionModel.habit_id, HabitCompletionModel.date)
+            .where(
+                HabitCompletionModel.user_id == user_id,
+                HabitCompletionModel.habit_id.in_({c["habit_id"] for c in completions}),
+                HabitCompletionModel.date.in_({c["date"] for c in completions})
+            )
+        )).all())
+        unique = []
+        for completion in completions:
+            key = (completion["habit_id"], completion["date"])
+            if key in existing:
+                report["skipped_duplicates"] += 1
+                continue
+            existing.add(key)
+            unique.append(completion)
+        completions = unique
+
+    try:
+        if new_habits:
+            await db.execute(HabitModel.__table__.insert(), new_habits)
+        if journal_rows:
+            await db.execute(JournalEntryModel.__table__.insert(), journal_rows)
+            await index_search_documents(db, user_id, "journal", [(row["id"], row["content"]) for row in journal_rows])
+        if completions:
+            await db.execute(HabitCompletionModel.__table__.insert(), completions)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        for habit in new_habits:
+            habit_ids.pop(habit["name"], None)
+        for line_no, _ in batch:
+            add_import_error(report, line_no, "Conflicted with a concurrent write, retry the import")
+        return
+    touched_habits.update(c["habit_id"] for c in completions)
+    report["imported"]["journal_entries"] += len(journal_rows)
+    report["imported"]["habit_completions"] += len(completions)
+    report["imported"]["habits_created"] += len(new_habits)
+
+async def refresh_imported_habit_streaks(db: AsyncSession, user_id: str, habit_ids: set):
+    best = dict((await db.execute(select(HabitModel.id, HabitModel.best_streak).where(HabitModel.id.in_(habit_ids)))).all())
+    streaks = (await db.execute(streak_query(
+        HabitCompletionModel.date,
+        HabitCompletionModel.user_id == user_id,
+        HabitCompletionModel.habit_id.in_(habit_ids),
+        group_col=HabitCompletionModel.habit_id
+    ))).all()
+    await db.execute(update(HabitModel), [
+        {
+            "id": row.group_key,
+            "streak": row.current,
+            "best_streak": max(best.get(row.group_key) or 0, row.longest),
+            "last_completed": row.last_day
+        }
+        for row in streaks
+    ])
+
+@api_router.post("/import")
+async def import_data(request: Request, import_format: Optional[str] = Query(None, alias="format"), user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    exempt_from_query_budget()
+    import_format = (import_format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")).lower()
+    if import_format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+
+    report = {"format": import_format, "rows": 0, "imported": {"journal_entries": 0, "habit_completions": 0, "habits_created": 0}, "skipped_duplicates": 0, "error_count": 0, "errors": []}
+    habit_ids = dict((await db.execute(select(HabitModel.name, HabitModel.id).where(HabitModel.user_id == user_id))).all())
+    touched_habits = set()
+    batch = []
+    async for line_no, row, error in iter_import_records(request.stream(), import_format):
+        report["rows"] += 1
+        if error:
+            add_import_error(report, line_no, error)
+            continue
+        batch.append((line_no, row))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await import_batch(db, user_id, batch, habit_ids, touched_habits, report)
+            batch = []
+    if batch:
+        await import_batch(db, user_id, batch, habit_ids, touched_habits, report)
+
+    if report["imported"]["journal_entries"] or report["imported"]["habit_completions"]:
+        if touched_habits:
+            await refresh_imported_habit_streaks(db, user_id, touched_habits)
+            await db.commit()
+        result = await db.execute(select(UserAnalyticsModel).where(UserAnalyticsModel.user_id == user_id).with_for_update())
+        await rebuild_analytics_rollup(db, user_id, result.scalar_one_or_none())
+        await db.commit()
+    report["errors"].sort(key=lambda error: error["line"])
+    return report
+
+
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', '72'))
+BATCH_OPERATIONS = {
+    endpoint.__name__: endpoint
+    for endpoint in (
+        create_goal, update_goal, delete_goal,
+        create_habit, update_habit, complete_habit, delete_habit,
+        create_vision_item, delete_vision_item,
+        create_journal_entry, create_exercise, complete_ritual,
+        add_wisdom_favorite, remove_wisdom_favorite,
+        create_identity_statement, add_identity_evidence,
+        create_obstacle, update_obstacle, delete_obstacle,
+        create_visualization, create_premeditatio, update_premeditatio,
+        create_habit_chain, complete_habit_chain, delete_habit_chain,
+        create_two_minute_rule, complete_two_minute_rule, delete_two_minute_rule,
+        create_mastermind_member, delete_mastermind_member, create_mastermind_meeting
+    )
+}
+
+class BatchSession(AsyncSession):
+    async def commit(self):
+        await self.flush()
+
+    async def rollback(self):
+        savepoint = self.get_nested_transaction()
+        if savepoint is None:
+            raise RuntimeError("Batch operations cannot roll back the enclosing transaction")
+        await savepoint.rollback()
+
+    async def commit_batch(self):
+        await super().commit()
+
+batch_session = async_sessionmaker(engine, class_=BatchSession, expire_on_commit=False)
+
+def batch_arguments(endpoint, operation: BatchOperation, user_id: str, db: BatchSession) -> Dict[str, Any]:
+    arguments = {}
+    for name, parameter in inspect_signature(endpoint).parameters.items():
+        if name == "user_id":
+            arguments[name] = user_id
+        elif name == "db":
+            arguments[name] = db
+        elif isinstance(parameter.annotation, type) and issubclass(parameter.annotation, BaseModel):
+            arguments[name] = parameter.annotation.model_validate(operation.body or {})
+        elif name in operation.params:
+            arguments[name] = operation.params[name]
+        else:
+            raise HTTPException(status_code=422, detail=f"Missing parameter {name}")
+    return arguments
+
+async def apply_batch_operation(db: BatchSession, operation: BatchOperation, user_id: str) -> Dict[str, Any]:
+    endpoint = BATCH_OPERATIONS.get(operation.op)
+    if endpoint is None:
+        return {"status": 400, "error": f"Unknown operation {operation.op}"}
+    events = pending_events.get()
+    published = len(events)
+    savepoint = await db.begin_nested()
+    try:
+        try:
+            result = jsonable_encoder(await endpoint(**batch_arguments(endpoint, operation, user_id, db)))
+            db.add(IdempotencyKeyModel(user_id=user_id, key=operation.idempotency_key, op=operation.op, result=result))
+            await db.flush()
+        except Exception:
+            if savepoint.is_active:
+                await savepoint.rollback()
+            del events[published:]
+            raise
+    except HTTPException as e:
+        return {"status": e.status_code, "error": e.detail}
+    except ValidationError as e:
+        return {"status": 422, "error": format_validation_error(e)}
+    except IntegrityError:
+        return {"status": 409, "error": "Conflicted with a concurrent write, retry the operation"}
+    except Exception:
+        logger.exception(f"Batch operation {operation.op} failed")
+        return {"status": 500, "error": "Internal server error"}
+    if savepoint.is_active:
+        await savepoint.commit()
+    return {"status": 200, "result": result}
+
+@api_router.post("/batch")
+async def apply_batch(batch: BatchRequest, user_id: str = Depends(get_current_user)):
+    exempt_from_query_budget()
+    keys = [operation.idempotency_key for operation in batch.operations]
+    invalidations = set()
+    events = []
+    reset = pending_invalidations.set(invalidations)
+    reset_events = pending_events.set(events)
+    try:
+        async with batch_session() as db:
+            if engine.dialect.name == "sqlite":
+                await db.execute(text("BEGIN IMMEDIATE"))
+            result = await db.execute(
+                select(IdempotencyKeyModel.key, IdempotencyKeyModel.op, IdempotencyKeyModel.result)
+                .where(IdempotencyKeyModel.user_id == user_id, IdempotencyKeyModel.key.in_(set(keys)))
+            )
+            applied = {key: (op, op_result) for key, op, op_result in result.all()}
+            results = []
+            for operation in batch.operations:
+                if operation.idempotency_key in applied:
+                    applied_op, applied_result = applied[operation.idempotency_key]
+                    if applied_op != operation.op:
+                        results.append({"idempotency_key": operation.idempotency_key, "op": operation.op, "replayed": False, "status": 409, "error": f"Idempotency key was already used for {applied_op}"})
+                    else:
+                        results.append({"idempotency_key": operation.idempotency_key, "op": operation.op, "replayed": True, "status": 200, "result": applied_result})
+                    continue
+                outcome = await apply_batch_operation(db, operation, user_id)
+                if outcome["status"] == 200:
+                    applied[operation.idempotency_key] = (operation.op, outcome["result"])
+                results.append({"idempotency_key": operation.idempotency_key, "op": operation.op, "replayed": False, **outcome})
+            await db.commit_batch()
+    finally:
+        pending_invalidations.reset(reset)
+        pending_events.reset(reset_events)
+    for invalidated_user_id, resource in invalidations:
+        await invalidate_cached_response(invalidated_user_id, resource)
+    for event_user_id, event in events:
+        await publish_event(event_user_id, event.pop("type"), **event)
+    batch_operations.inc(("replayed",), sum(1 for r in results if r["replayed"]))
+    batch_operations.inc(("applied",), sum(1 for r in results if not r["replayed"] and r["status"] == 200))
+    batch_operations.inc(("failed",), sum(1 for r in results if r["status"] != 200))
+    return {"results": results}
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_status = [500]
+
+        stats = {"queries": 0, "db_seconds": 0.0, "commits": 0, "statements": {}, "scope": scope}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                response_status[0] = message["status"]
+                if QUERY_BUDGET_MODE != "off":
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"x-db-queries", str(stats["queries"]).encode()),
+                        (b"x-db-commits", str(stats["commits"]).encode()),
+                    ]
+            await send(message)
+
+        token = request_db_stats.set(stats)
+        http_requests_in_flight["value"] += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight["value"] -= 1
+            request_db_stats.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            http_request_duration.observe(labels, elapsed)
+            http_responses.inc(labels + (str(response_status[0]),))
+            db_queries_per_request.observe(labels, stats["queries"])
+            db_seconds_per_request.observe(labels, stats["db_seconds"])
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router)
 
+def pool_metrics_lines() -> List[str]:
+    pool = engine.sync_engine.pool
+    lines = [
+        "# TYPE db_pool_checkout_wait_seconds summary",
+        f"db_pool_checkout_wait_seconds_sum {pool_stats['checkout_wait_seconds']:.6f}",
+        f"db_pool_checkout_wait_seconds_count {pool_stats['checkouts']}",
+        "# TYPE db_pool_checkout_wait_max_seconds gauge",
+        f"db_pool_checkout_wait_max_seconds {pool_stats['checkout_wait_max_seconds']:.6f}",
+        "# TYPE db_pool_timeouts_total counter",
+        f"db_pool_timeouts_total {pool_stats['timeouts']}",
+    ]
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        lines += [
+            "# TYPE db_pool_size gauge",
+            f"db_pool_size {pool.size()}",
+            "# TYPE db_pool_max_overflow gauge",
+            f"db_pool_max_overflow {DB_MAX_OVERFLOW}",
+            "# TYPE db_pool_checked_out gauge",
+            f"db_pool_checked_out {pool.checkedout()}",
+            "# TYPE db_pool_checked_in gauge",
+            f"db_pool_checked_in {pool.checkedin()}",
+            "# TYPE db_pool_overflow gauge",
+            f"db_pool_overflow {max(0, pool.overflow())}",
+        ]
+    return lines
+
+def render_metrics() -> str:
+    lines = pool_metrics_lines() + [
+        "# TYPE password_hash_queue_depth gauge",
+        f"password_hash_queue_depth {password_hash_queue_depth()}",
+        "# TYPE password_hash_pending gauge",
+        f"password_hash_pending {password_hash_stats['pending']}",
+        "# TYPE password_hash_workers gauge",
+        f"password_hash_workers {PASSWORD_HASH_WORKERS}",
+        "# TYPE password_hash_completed_total counter",
+        f"password_hash_completed_total {password_hash_stats['completed']}",
+        "# TYPE password_hash_failed_total counter",
+        f"password_hash_failed_total {password_hash_stats['failed']}",
+        "# TYPE password_hash_rejected_total counter",
+        f"password_hash_rejected_total {password_hash_stats['rejected']}",
+        "# TYPE password_hash_rehashed_total counter",
+        f"password_hash_rehashed_total {password_hash_stats['rehashed']}",
+        "# TYPE token_cache_entries gauge",
+        f"token_cache_entries {len(token_cache.entries)}",
+        "# TYPE token_cache_hits_total counter",
+        f"token_cache_hits_total {token_cache.stats['hits']}",
+        "# TYPE token_cache_misses_total counter",
+        f"token_cache_misses_total {token_cache.stats['misses']}",
+        "# TYPE token_cache_evictions_total counter",
+        f"token_cache_evictions_total {token_cache.stats['evictions']}",
+        "# TYPE revoked_tokens gauge",
+        f"revoked_tokens {len(revoked_tokens)}",
+        "# TYPE event_stream_connections gauge",
+        f"event_stream_connections {event_hub.connection_count()}",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {http_requests_in_flight['value']}",
+    ]
+    for metric in (http_request_duration, http_responses, db_queries_per_request, db_seconds_per_request, db_queries_total, db_query_seconds_total, response_cache_lookups, response_not_modified, response_cache_invalidations, export_rows, sync_rows, batch_operations, events_published, events_dropped):
+        lines += metric.lines()
+    return "\n".join(lines) + "\n"
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_metrics()
+
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("Database tables created")
+    await verify_schema_version()
+    await event_backend.start()
+    if CHECK_INDEXES_ON_STARTUP:
+        await check_schema_indexes()
+    if TOKEN_REVOCATION_STORE == "database":
+        await sync_revoked_tokens()
+        if TOKEN_REVOCATION_SYNC_SECONDS > 0:
+            revocation_sync_state["task"] = asyncio.create_task(revocation_sync_loop())
 
 @app.on_event("shutdown")
 async def shutdown():
+    if revocation_sync_state["task"] is not None:
+        revocation_sync_state["task"].cancel()
+    await event_backend.stop()
     await engine.dispose()
+    password_executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Growth backend maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild-analytics", help="Backfill per-user analytics rollups")
+    rebuild_parser.add_argument("--user-id", default=None)
+    subparsers.add_parser("migrate", help="Apply pending schema migrations (run once per deploy, before starting workers)")
+    subparsers.add_parser("check-indexes", help="Report declared indexes missing from the live schema")
+    subparsers.add_parser("reconcile-streaks", help="Reset streaks of habits not completed since yesterday (run nightly)")
+    subparsers.add_parser("prune-tombstones", help="Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS (run nightly)")
+    subparsers.add_parser("prune-idempotency-keys", help="Delete batch idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS (run nightly)")
+    subparsers.add_parser("prune-revoked-tokens", help="Delete revoked tokens whose expiry has passed (run nightly)")
+    args = parser.parse_args()
+
+    if args.command == "rebuild-analytics":
+        asyncio.run(rebuild_analytics(args.user_id))
+    elif args.command == "migrate":
+        asyncio.run(run_migrations())
+    elif args.command == "check-indexes":
+        asyncio.run(check_schema_indexes())
+    elif args.command == "reconcile-streaks":
+        asyncio.run(reconcile_streaks())
+    elif args.command == "prune-tombstones":
+        asyncio.run(prune_tombstones())
+    elif args.command == "prune-idempotency-keys":
+        asyncio.run(prune_idempotency_keys())
+    elif args.command == "prune-revoked-tokens":
+        asyncio.run(prune_expired_revoked_tokens())
@@ -105,6 +105,32 @@ export const apiGet = async (endpoint, token, options = {}) => {
   }
 };
 
+/**
+ * Fetches one page of a paginated list endpoint
+ * nextCursor is null on the last page
+ */
+export const fetchPage = async (endpoint, token, params = {}) => {
+  const response = await axios.get(`${API_BASE}${endpoint}`, {
+    headers: { Authorization: `Bearer ${token}` },
+    params,
+  });
+  return { items: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
+/**
+ * Follows X-Next-Cursor until every page of a list endpoint has been fetched
+ */
+export const fetchAllPages = async (endpoint, token, params = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const page = await fetchPage(endpoint, token, cursor ? { ...params, cursor } : params);
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+};
+
 /**
  * Generic POST request
  */
@@ -11,6 +11,7 @@ import {
   Quote, Eye, Sun, Flame, Shield, Clock, Calendar
 } from 'lucide-react';
 import axios from 'axios';
+import { fetchAllPages } from '@/lib/api';
 import { toast } from 'sonner';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -127,14 +128,12 @@ const Exercises = ({ token }) => {
 
   const fetchExercises = async () => {
     try {
-      const response = await axios.get(`${API}/exercises`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setExercises(response.data);
+      const allExercises = await fetchAllPages('/exercises', token);
+      setExercises(allExercises);
       
       // Check which exercises were completed today
       const today = new Date().toISOString().split('T')[0];
-      const todayExercises = response.data
+      const todayExercises = allExercises
         .filter(e => e.date?.startsWith(today))
         .map(e => e.exercise_type);
       setCompletedToday(new Set(todayExercises));
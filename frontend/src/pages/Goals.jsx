@@ -14,6 +14,7 @@ import {
   Check, Zap, Edit3
 } from 'lucide-react';
 import axios from 'axios';
+import { fetchAllPages } from '@/lib/api';
 import { toast } from 'sonner';
 import PhilosophyIcon from '@/components/PhilosophyIcon';
 
@@ -72,10 +73,7 @@ const Goals = ({ token }) => {
 
   const fetchGoals = async () => {
     try {
-      const response = await axios.get(`${API}/goals`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setGoals(response.data);
+      setGoals(await fetchAllPages('/goals', token));
     } catch (error) {
       toast.error('Failed to load goals');
     } finally {
@@ -8,6 +8,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { Plus, Target, Trash2, Edit, CheckCircle, Calendar, Mountain, Crown, Layers, ArrowRight } from 'lucide-react';
 import axios from 'axios';
+import { fetchAllPages } from '@/lib/api';
 import { toast } from 'sonner';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -44,10 +45,7 @@ const Goals = ({ token }) => {
 
   const fetchGoals = async () => {
     try {
-      const response = await axios.get(`${API}/goals`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setGoals(response.data);
+      setGoals(await fetchAllPages('/goals', token));
     } catch (error) {
       toast.error('Failed to load goals');
     } finally {
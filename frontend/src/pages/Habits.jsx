@@ -13,6 +13,7 @@ import {
   Heart, Brain, ChevronRight, Eye
 } from 'lucide-react';
 import axios from 'axios';
+import { fetchAllPages } from '@/lib/api';
 import { toast } from 'sonner';
 import PhilosophyIcon from '@/components/PhilosophyIcon';
 
@@ -63,6 +64,7 @@ const itemVariants = {
 
 const Habits = ({ token }) => {
   const [habits, setHabits] = useState([]);
+  const [totalCompletions, setTotalCompletions] = useState(0);
   const [loading, setLoading] = useState(true);
   const [dialogOpen, setDialogOpen] = useState(false);
   const [completingHabit, setCompletingHabit] = useState(null);
@@ -79,10 +81,12 @@ const Habits = ({ token }) => {
 
   const fetchHabits = async () => {
     try {
-      const response = await axios.get(`${API}/habits`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setHabits(response.data);
+      const [allHabits, analyticsRes] = await Promise.all([
+        fetchAllPages('/habits', token),
+        axios.get(`${API}/analytics/overview`, { headers: { Authorization: `Bearer ${token}` } })
+      ]);
+      setHabits(allHabits);
+      setTotalCompletions(analyticsRes.data.habits.total_completions);
     } catch (error) {
       toast.error('Failed to load habits');
     } finally {
@@ -182,7 +186,6 @@ const Habits = ({ token }) => {
   const completedToday = habits.filter(isCompletedToday).length;
   const maxStreak = Math.max(...habits.map(h => h.streak || 0), 0);
   const bestStreak = Math.max(...habits.map(h => h.best_streak || 0), 0);
-  const totalCompletions = habits.reduce((acc, h) => acc + (h.completion_dates?.length || 0), 0);
   const todayProgress = totalHabits > 0 ? Math.round((completedToday / totalHabits) * 100) : 0;
 
   if (loading) {
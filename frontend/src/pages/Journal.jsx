@@ -12,6 +12,7 @@ import {
   Flame, Star, TrendingUp, Eye, Quote, PenTool, Clock
 } from 'lucide-react';
 import axios from 'axios';
+import { fetchAllPages } from '@/lib/api';
 import { toast } from 'sonner';
 import PhilosophyIcon from '@/components/PhilosophyIcon';
 
@@ -96,10 +97,7 @@ const Journal = ({ token }) => {
 
   const fetchEntries = async () => {
     try {
-      const response = await axios.get(`${API}/journal`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setEntries(response.data);
+      setEntries(await fetchAllPages('/journal', token));
     } catch (error) {
       toast.error('Failed to load journal');
     } finally {
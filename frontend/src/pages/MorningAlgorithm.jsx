@@ -8,6 +8,7 @@ import {
 } from 'lucide-react';
 import { Link } from 'react-router-dom';
 import axios from 'axios';
+import { fetchAllPages } from '@/lib/api';
 import { toast } from 'sonner';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -76,13 +77,13 @@ const MorningAlgorithm = ({ token, userPreferences }) => {
   const fetchUserData = async () => {
     try {
       const headers = { Authorization: `Bearer ${token}` };
-      const [goalsRes, habitsRes, analyticsRes] = await Promise.all([
-        axios.get(`${API}/goals`, { headers }),
-        axios.get(`${API}/habits`, { headers }),
+      const [allGoals, allHabits, analyticsRes] = await Promise.all([
+        fetchAllPages('/goals', token),
+        fetchAllPages('/habits', token),
         axios.get(`${API}/analytics/overview`, { headers })
       ]);
-      setGoals(goalsRes.data);
-      setHabits(habitsRes.data);
+      setGoals(allGoals);
+      setHabits(allHabits);
       setAnalytics(analyticsRes.data);
     } catch (error) {
       console.error('Error fetching data:', error);
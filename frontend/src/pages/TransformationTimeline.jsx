@@ -6,12 +6,9 @@ import {
   Star, Sparkles, ChevronDown, ChevronUp, Clock,
   Award, Heart, Mountain, Crown, Zap, Download
 } from 'lucide-react';
-import axios from 'axios';
+import { fetchAllPages } from '@/lib/api';
 import { toast } from 'sonner';
 
-const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
-const API = `${BACKEND_URL}/api`;
-
 // Generate AI chapter titles based on activity
 const generateChapterTitle = (period, stats) => {
   if (stats.goals_completed > 3) return "The Breakthrough";
@@ -35,18 +32,18 @@ const TransformationTimeline = ({ token }) => {
   const fetchTimelineData = async () => {
     try {
       // Fetch all user data to build timeline
-      const [goalsRes, habitsRes, journalRes, exercisesRes] = await Promise.all([
-        axios.get(`${API}/goals`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/habits`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/journal`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/exercises`, { headers: { Authorization: `Bearer ${token}` } })
+      const [goals, habits, journal, exercises] = await Promise.all([
+        fetchAllPages('/goals', token),
+        fetchAllPages('/habits', token),
+        fetchAllPages('/journal', token),
+        fetchAllPages('/exercises', token)
       ]);
 
       // Group events by month
       const events = [];
       
       // Process goals
-      goalsRes.data.forEach(goal => {
+      goals.forEach(goal => {
         events.push({
           type: 'goal_created',
           title: `Set goal: ${goal.title}`,
@@ -70,7 +67,7 @@ const TransformationTimeline = ({ token }) => {
       });
 
       // Process journal entries
-      journalRes.data.forEach(entry => {
+      journal.forEach(entry => {
         events.push({
           type: 'journal',
           title: 'Journal Entry',
@@ -83,7 +80,7 @@ const TransformationTimeline = ({ token }) => {
       });
 
       // Process exercises
-      exercisesRes.data.forEach(exercise => {
+      exercises.forEach(exercise => {
         events.push({
           type: 'exercise',
           title: `Completed: ${exercise.exercise_type.replace('_', ' ')}`,
@@ -95,7 +92,7 @@ const TransformationTimeline = ({ token }) => {
       });
 
       // Process habit streaks (add milestone events)
-      habitsRes.data.forEach(habit => {
+      habits.forEach(habit => {
         if (habit.best_streak >= 7) {
           events.push({
             type: 'streak_milestone',
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.sqlite"
+os.environ["QUERY_BUDGET_MODE"] = "enforce"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["TOKEN_REVOCATION_SYNC_SECONDS"] = "0"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+import server  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    async def migrate():
+        await server.run_migrations()
+        await server.engine.dispose()
+    asyncio.run(migrate())
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    await server.engine.dispose()
+
+
+@pytest.fixture
+async def headers(client):
+    return await register(client)
+
+
+async def register(client):
+    response = await client.post("/api/auth/register", json={"email": f"{uuid.uuid4()}@example.com", "password": "secret", "name": "Test"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def user_id_of(headers):
+    return server.decode_token(headers["Authorization"].removeprefix("Bearer "))[0]
@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+import server
+
+from .conftest import user_id_of
+
+pytestmark = pytest.mark.anyio
+
+
+async def stored_rollup(user_id):
+    async with server.async_session() as db:
+        rollup = (await db.execute(select(server.UserAnalyticsModel).where(server.UserAnalyticsModel.user_id == user_id))).scalar_one()
+        return {c.name: getattr(rollup, c.name) for c in server.UserAnalyticsModel.__table__.columns if c.name != "updated_at"}
+
+
+async def rebuilt_rollup(user_id):
+    async with server.async_session() as db:
+        rollup = await server.rebuild_analytics_rollup(db, user_id)
+        values = {c.name: getattr(rollup, c.name) for c in server.UserAnalyticsModel.__table__.columns if c.name != "updated_at"}
+        await db.rollback()
+    return values
+
+
+def without_empty_entries(values):
+    values["goals_by_category"] = {k: v for k, v in values["goals_by_category"].items() if v["total"] > 0}
+    values["mood_distribution"] = {k: v for k, v in values["mood_distribution"].items() if v > 0}
+    return values
+
+
+async def test_incremental_rollup_matches_a_rebuild(client, headers):
+    user_id = user_id_of(headers)
+    goals = []
+    for category in ("health", 'the "inner" game', "a.b", None):
+        body = {"title": "g", "milestones": [{"completed": False}]}
+        if category:
+            body["category"] = category
+        goals.append((await client.post("/api/goals", headers=headers, json=body)).json())
+    await client.put(f"/api/goals/{goals[0]['id']}", headers=headers, json={"milestones": [{"completed": True}]})
+    await client.put(f"/api/goals/{goals[1]['id']}", headers=headers, json={"category": "health"})
+    await client.delete(f"/api/goals/{goals[2]['id']}", headers=headers)
+
+    habits = [(await client.post("/api/habits", headers=headers, json={"name": n, "description": "d"})).json() for n in "abc"]
+    last_week = (datetime.now(timezone.utc).date() - timedelta(days=7)).isoformat()
+    async with server.async_session() as db:
+        await db.execute(update(server.HabitModel).where(server.HabitModel.id == habits[0]["id"]).values(streak=9, best_streak=9, last_completed=last_week))
+        await db.execute(update(server.UserAnalyticsModel).where(server.UserAnalyticsModel.user_id == user_id).values(habits_streak_sum=9, habits_max_streak=9, habits_best_streak=9))
+        await db.commit()
+    for habit in habits:
+        await client.post(f"/api/habits/{habit['id']}/complete", headers=headers)
+    await client.delete(f"/api/habits/{habits[1]['id']}", headers=headers)
+
+    for mood in ("happy", "it's \"complicated\"", None, "happy"):
+        await client.post("/api/journal", headers=headers, json={"content": "x", "mood": mood})
+    await client.post("/api/exercises", headers=headers, json={"exercise_type": "t", "content": {}})
+
+    assert without_empty_entries(await stored_rollup(user_id)) == await rebuilt_rollup(user_id)
+
+    overview = (await client.get("/api/analytics/overview", headers=headers)).json()
+    assert overview["goals"]["by_category"] == {"health": {"total": 2, "completed": 1}, "personal": {"total": 1, "completed": 0}}
+    assert (overview["habits"]["max_streak"], overview["habits"]["best_streak_ever"]) == (1, 9)
+    assert overview["journal"]["mood_distribution"] == {"happy": 2, "it's \"complicated\"": 1, "reflective": 1}
+    assert overview["habit_completions_7_days"][0] == {"date": datetime.now(timezone.utc).date().isoformat(), "completed": 2, "total": 2}
+
+
+async def test_parallel_writes_are_all_counted(client, headers):
+    user_id = user_id_of(headers)
+    await asyncio.gather(*(
+        client.post("/api/goals", headers=headers, json={"title": str(i), "category": "health"}) for i in range(8)
+    ), *(
+        client.post("/api/journal", headers=headers, json={"content": str(i), "mood": "calm"}) for i in range(8)
+    ))
+    assert without_empty_entries(await stored_rollup(user_id)) == await rebuilt_rollup(user_id)
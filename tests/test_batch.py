@@ -0,0 +1,35 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_a_failing_operation_does_not_abort_the_batch(client, headers):
+    operations = [
+        {"idempotency_key": "journal", "op": "create_journal_entry", "body": {"content": "kept"}},
+        {"idempotency_key": "ritual", "op": "complete_ritual", "body": {"ritual_type": "morning", "completed_at": "garbage"}},
+        {"idempotency_key": "favorite", "op": "add_wisdom_favorite", "body": {"quote_id": "q1"}},
+    ]
+    response = await client.post("/api/batch", headers=headers, json={"operations": operations})
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == [200, 422, 200]
+
+    assert len((await client.get("/api/journal", headers=headers)).json()) == 1
+    assert len((await client.get("/api/wisdom/favorites", headers=headers)).json()) == 1
+    assert (await client.get("/api/rituals/completed", headers=headers)).json() == []
+    direct = await client.post("/api/rituals/complete", headers=headers, json={"ritual_type": "morning", "completed_at": "garbage"})
+    assert direct.status_code == 422
+
+    retry = await client.post("/api/batch", headers=headers, json={"operations": operations})
+    assert [(r["status"], r["replayed"]) for r in retry.json()["results"]] == [(200, True), (422, False), (200, True)]
+
+
+async def test_reusing_a_key_for_another_operation_conflicts(client, headers):
+    create = {"idempotency_key": "shared", "op": "create_journal_entry", "body": {"content": "first"}}
+    favorite = {"idempotency_key": "shared", "op": "add_wisdom_favorite", "body": {"quote_id": "q1"}}
+
+    same_batch = await client.post("/api/batch", headers=headers, json={"operations": [create, favorite]})
+    assert [r["status"] for r in same_batch.json()["results"]] == [200, 409]
+
+    later = await client.post("/api/batch", headers=headers, json={"operations": [favorite, create]})
+    assert [(r["status"], r["replayed"]) for r in later.json()["results"]] == [(409, False), (200, True)]
+    assert (await client.get("/api/wisdom/favorites", headers=headers)).json() == []
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+PARALLEL = 16
+
+
+async def test_parallel_chain_completions_are_all_counted(client, headers):
+    chain = (await client.post("/api/habit-stacking", headers=headers, json={"name": "c", "existing_habit": "a", "new_habit": "b"})).json()
+    outcomes = [i % 3 != 0 for i in range(PARALLEL)]
+    responses = await asyncio.gather(*(
+        client.post(f"/api/habit-stacking/{chain['id']}/complete", headers=headers, json={"chain_id": chain["id"], "success": success})
+        for success in outcomes
+    ))
+    succeeded = [success for success, response in zip(outcomes, responses) if response.status_code == 200]
+    assert len(succeeded) == PARALLEL
+
+    stored = (await client.get("/api/habit-stacking", headers=headers)).json()[0]
+    assert stored["total_attempts"] == len(succeeded)
+    assert stored["success_count"] == sum(succeeded)
+    assert stored["chain_strength"] == sum(succeeded) * 100 // len(succeeded)
+    assert sorted(r.json()["total_attempts"] for r in responses) == list(range(1, PARALLEL + 1))
+
+
+async def test_parallel_rule_completions_count_once_per_day(client, headers):
+    rule = (await client.post("/api/two-minute-rule", headers=headers, json={"full_habit": "a", "two_minute_version": "b"})).json()
+    responses = await asyncio.gather(*(client.post(f"/api/two-minute-rule/{rule['id']}/complete", headers=headers) for _ in range(PARALLEL)))
+    assert [r.status_code for r in responses] == [200] * PARALLEL
+
+    async with server.async_session() as db:
+        completion_count = (await db.execute(select(server.TwoMinuteRuleModel.completion_count).where(server.TwoMinuteRuleModel.id == rule["id"]))).scalar()
+        completions = (await db.execute(select(func.count()).where(server.TwoMinuteRuleCompletionModel.rule_id == rule["id"]))).scalar()
+    assert completion_count == completions == 1
@@ -0,0 +1,85 @@
+import asyncio
+from urllib.parse import urlencode
+
+import orjson
+import pytest
+
+import server
+
+from .conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+class EventStream:
+    # httpx's ASGI transport buffers the whole body, so drive the app directly.
+    def __init__(self, query=None, headers=None):
+        self.scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": "/api/events", "raw_path": b"/api/events", "root_path": "", "query_string": urlencode(query or {}).encode(),
+            "headers": [(b"host", b"test")] + [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        self.messages = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self.requested = False
+        self.buffer = b""
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(server.app(self.scope, self.receive, self.messages.put))
+        start = await asyncio.wait_for(self.messages.get(), 5)
+        self.status = start["status"]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 5)
+
+    async def next_event(self, timeout=5):
+        while b"\n\n" not in self.buffer:
+            message = await asyncio.wait_for(self.messages.get(), timeout)
+            self.buffer += message.get("body", b"")
+        frame, self.buffer = self.buffer.split(b"\n\n", 1)
+        data = [line[len(b"data: "):] for line in frame.split(b"\n") if line.startswith(b"data: ")]
+        return orjson.loads(data[0]) if data else await self.next_event(timeout)
+
+
+async def event_token(client, headers):
+    response = await client.post("/api/events/token", headers=headers)
+    assert response.status_code == 200
+    return response.json()["token"]
+
+
+async def test_events_reach_only_their_owner(client):
+    alice, bob = await register(client), await register(client)
+    async with EventStream({"token": await event_token(client, alice)}) as alice_events, EventStream(headers=bob) as bob_events:
+        assert alice_events.status == bob_events.status == 200
+
+        alice_habit = (await client.post("/api/habits", headers=alice, json={"name": "a", "description": "d"})).json()
+        bob_goal = (await client.post("/api/goals", headers=bob, json={"title": "b"})).json()
+        await client.post(f"/api/habits/{alice_habit['id']}/complete", headers=alice)
+
+        assert await alice_events.next_event() == {"type": "habit.created", "id": alice_habit["id"]}
+        assert (await alice_events.next_event())["type"] == "habit.completed"
+        assert await bob_events.next_event() == {"type": "goal.created", "id": bob_goal["id"], "status": "active", "progress": 0}
+        with pytest.raises(asyncio.TimeoutError):
+            await bob_events.next_event(timeout=0.2)
+    assert server.event_hub.connection_count() == 0
+
+
+async def test_event_tokens_only_open_the_stream(client, headers):
+    token = await event_token(client, headers)
+    assert (await client.get("/api/goals", headers={"Authorization": f"Bearer {token}"})).status_code == 401
+
+    session_token = headers["Authorization"].removeprefix("Bearer ")
+    async with EventStream({"token": session_token}) as stream:
+        assert stream.status == 401
+    async with EventStream() as stream:
+        assert stream.status == 403
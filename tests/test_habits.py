@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+
+from .conftest import user_id_of
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_completion_dates_cover_only_the_recent_window(client, headers):
+    user_id = user_id_of(headers)
+    habit = (await client.post("/api/habits", headers=headers, json={"name": "Read", "description": "pages"})).json()
+    today = datetime.now(timezone.utc).date()
+    dates = [(today - timedelta(days=i)).isoformat() for i in range(1, 400)]
+    async with server.async_session() as db:
+        db.add_all(server.HabitCompletionModel(id=str(uuid.uuid4()), habit_id=habit["id"], user_id=user_id, date=date) for date in dates)
+        await db.commit()
+    recent = sorted(dates[:server.COMPLETION_DATES_DAYS - 1])
+
+    listed = (await client.get("/api/habits", headers=headers)).json()
+    assert listed[0]["completion_dates"] == recent
+
+    updated = await client.put(f"/api/habits/{habit['id']}", headers=headers, json={"description": "chapters"})
+    assert updated.json()["completion_dates"] == recent
+
+    synced = (await client.get("/api/sync", headers=headers)).json()
+    assert synced["changes"]["habits"][0]["completion_dates"] == recent
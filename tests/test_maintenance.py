@@ -0,0 +1,21 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_prune_revoked_tokens_keeps_unexpired_revocations():
+    now = datetime.now(timezone.utc)
+    async with server.async_session() as db:
+        db.add(server.RevokedTokenModel(token_hash="expired", user_id="u", expires_at=now - timedelta(minutes=1)))
+        db.add(server.RevokedTokenModel(token_hash="live", user_id="u", expires_at=now + timedelta(days=1)))
+        await db.commit()
+    await server.prune_expired_revoked_tokens()
+    async with server.async_session() as db:
+        remaining = set((await db.execute(select(server.RevokedTokenModel.token_hash).where(server.RevokedTokenModel.token_hash.in_(["expired", "live"])))).scalars())
+    await server.engine.dispose()
+    assert remaining == {"live"}
@@ -0,0 +1,33 @@
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+import server
+
+from .conftest import user_id_of
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_lists_are_paged_even_without_limit_or_cursor(client, headers):
+    user_id = user_id_of(headers)
+    start = date(2024, 1, 1)
+    async with server.async_session() as db:
+        db.add_all(
+            server.JournalEntryModel(id=str(uuid.uuid4()), user_id=user_id, content=f"entry {i}", gratitude=[], date=(start + timedelta(days=i)).isoformat())
+            for i in range(server.DEFAULT_PAGE_SIZE + 5)
+        )
+        await db.commit()
+
+    first = await client.get("/api/journal", headers=headers)
+    assert len(first.json()) == server.DEFAULT_PAGE_SIZE
+    cursor = first.headers[server.NEXT_CURSOR_HEADER]
+
+    rest = await client.get("/api/journal", headers=headers, params={"cursor": cursor})
+    assert len(rest.json()) == 5
+    assert server.NEXT_CURSOR_HEADER not in rest.headers
+    assert {e["id"] for e in first.json()}.isdisjoint(e["id"] for e in rest.json())
+
+    too_many = await client.get("/api/journal", headers=headers, params={"limit": server.MAX_PAGE_SIZE + 1})
+    assert too_many.status_code == 422
@@ -0,0 +1,182 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+from sqlalchemy import delete, event, update
+
+import server
+
+from .conftest import register, user_id_of
+
+pytestmark = pytest.mark.anyio
+
+
+async def call(client, headers, method, path, expected=200, **kwargs):
+    response = await client.request(method, path, headers=headers, **kwargs)
+    assert response.status_code == expected, f"{method} {path}: {response.status_code} {response.text}"
+    return response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
+
+
+async def test_every_route_stays_within_its_budget(client, headers):
+    await call(client, None, "POST", "/api/auth/login", json={"email": "nobody@example.com", "password": "x"}, expected=401)
+
+    goal = await call(client, headers, "POST", "/api/goals", json={"title": "g", "milestones": [{"completed": True}, {"completed": False}]})
+    await call(client, headers, "GET", "/api/goals")
+    await call(client, headers, "GET", "/api/goals", params={"limit": 1})
+    await call(client, headers, "PUT", f"/api/goals/{goal['id']}", json={"milestones": [{"completed": True}]})
+
+    habit = await call(client, headers, "POST", "/api/habits", json={"name": "h", "description": "d"})
+    await call(client, headers, "GET", "/api/habits")
+    await call(client, headers, "POST", f"/api/habits/{habit['id']}/complete")
+    await call(client, headers, "POST", f"/api/habits/{habit['id']}/complete")
+    await call(client, headers, "PUT", f"/api/habits/{habit['id']}", json={"name": "h2"})
+
+    item = await call(client, headers, "POST", "/api/vision-board", json={"type": "text", "content": "c"})
+    await call(client, headers, "GET", "/api/vision-board")
+    await call(client, headers, "DELETE", f"/api/vision-board/{item['id']}")
+
+    await call(client, headers, "POST", "/api/journal", json={"content": "walked by the river", "mood": "happy"})
+    await call(client, headers, "GET", "/api/journal")
+    await call(client, headers, "POST", "/api/exercises", json={"exercise_type": "t", "content": {}})
+    await call(client, headers, "GET", "/api/exercises")
+    await call(client, headers, "GET", "/api/analytics/overview")
+    await call(client, headers, "GET", "/api/streaks")
+    await call(client, headers, "GET", "/api/dashboard")
+
+    await call(client, headers, "POST", "/api/rituals/complete", json={"ritual_type": "morning", "completed_at": datetime.now(timezone.utc).isoformat()})
+    await call(client, headers, "GET", "/api/rituals/completed")
+    await call(client, headers, "POST", "/api/wisdom/favorites", json={"quote_id": "q1"})
+    await call(client, headers, "GET", "/api/wisdom/favorites")
+    await call(client, headers, "DELETE", "/api/wisdom/favorites/q1")
+    await call(client, headers, "POST", "/api/wisdom/notifications", json={"enabled": False})
+
+    statement = await call(client, headers, "POST", "/api/identity/statements", json={"old_identity": "o", "new_identity": "n"})
+    await call(client, headers, "GET", "/api/identity/statements")
+    await call(client, headers, "POST", "/api/identity/evidence", json={"identity_id": statement["id"], "evidence_text": "ran today"})
+    await call(client, headers, "GET", f"/api/identity/evidence/{statement['id']}")
+
+    obstacle = await call(client, headers, "POST", "/api/obstacles", json={"obstacle_text": "o"})
+    await call(client, headers, "GET", "/api/obstacles")
+    await call(client, headers, "PUT", f"/api/obstacles/{obstacle['id']}", json={"perception": "p", "action": "a", "will": "w"})
+    await call(client, headers, "DELETE", f"/api/obstacles/{obstacle['id']}")
+
+    desire = await call(client, headers, "POST", "/api/burning-desire", json={"desire_text": "d", "why_text": "w", "vision_text": "v"})
+    await call(client, headers, "POST", "/api/burning-desire", json={"desire_text": "d2", "why_text": "w", "vision_text": "v"})
+    await call(client, headers, "GET", "/api/burning-desire")
+    await call(client, headers, "POST", "/api/burning-desire/visualizations", json={"desire_id": desire["id"], "intensity_rating": 5, "emotion": "joy"})
+    await call(client, headers, "GET", "/api/burning-desire/visualizations")
+
+    practice = await call(client, headers, "POST", "/api/premeditatio", json={"scenario": "s"})
+    await call(client, headers, "GET", "/api/premeditatio")
+    await call(client, headers, "PUT", f"/api/premeditatio/{practice['id']}", json={"resilience_score": 5})
+
+    chain = await call(client, headers, "POST", "/api/habit-stacking", json={"name": "c", "existing_habit": "a", "new_habit": "b"})
+    await call(client, headers, "GET", "/api/habit-stacking")
+    await call(client, headers, "POST", f"/api/habit-stacking/{chain['id']}/complete", json={"chain_id": chain["id"], "success": True})
+    await call(client, headers, "DELETE", f"/api/habit-stacking/{chain['id']}")
+
+    rule = await call(client, headers, "POST", "/api/two-minute-rule", json={"full_habit": "a", "two_minute_version": "b"})
+    await call(client, headers, "GET", "/api/two-minute-rule")
+    await call(client, headers, "POST", f"/api/two-minute-rule/{rule['id']}/complete")
+    await call(client, headers, "DELETE", f"/api/two-minute-rule/{rule['id']}")
+
+    member = await call(client, headers, "POST", "/api/mastermind/members", json={"name": "n", "expertise": "e", "contribution": "c"})
+    await call(client, headers, "GET", "/api/mastermind/members")
+    await call(client, headers, "POST", "/api/mastermind/meetings", json={"member_id": member["id"], "topic": "t", "insights": "i"})
+    await call(client, headers, "GET", "/api/mastermind/meetings")
+    await call(client, headers, "DELETE", f"/api/mastermind/members/{member['id']}")
+
+    rows = b"\n".join(orjson.dumps(row) for row in (
+        {"kind": "journal", "date": "2024-01-01", "content": "imported"},
+        {"kind": "habit", "date": "2024-01-01", "name": "imported habit"},
+    ))
+    await call(client, {**headers, "content-type": "application/x-ndjson"}, "POST", "/api/import", content=rows)
+    await call(client, headers, "POST", "/api/batch", json={"operations": [
+        {"idempotency_key": "k1", "op": "complete_habit", "params": {"habit_id": habit["id"]}},
+        {"idempotency_key": "k2", "op": "create_journal_entry", "body": {"content": "batched"}},
+    ]})
+    await call(client, headers, "GET", "/api/search", params={"q": "river"})
+    sync = await call(client, headers, "GET", "/api/sync")
+    await call(client, headers, "GET", "/api/sync", params={"since": sync["token"]})
+    await call(client, headers, "GET", "/api/export")
+
+    await call(client, headers, "DELETE", f"/api/goals/{goal['id']}")
+    await call(client, headers, "DELETE", f"/api/habits/{habit['id']}")
+    await call(client, headers, "GET", "/metrics")
+    await call(client, headers, "POST", "/api/auth/logout")
+
+
+async def test_completing_a_broken_streak_refreshes_the_extremes_within_budget(client, headers):
+    user_id = user_id_of(headers)
+    habit = await call(client, headers, "POST", "/api/habits", json={"name": "h", "description": "d"})
+    other = await call(client, headers, "POST", "/api/habits", json={"name": "other", "description": "d"})
+    last_week = (datetime.now(timezone.utc).date() - timedelta(days=7)).isoformat()
+    async with server.async_session() as db:
+        await db.execute(update(server.HabitModel).where(server.HabitModel.id == habit["id"]).values(streak=5, best_streak=5, last_completed=last_week))
+        await db.execute(update(server.HabitModel).where(server.HabitModel.id == other["id"]).values(streak=3, best_streak=3, last_completed=last_week))
+        await db.execute(update(server.UserAnalyticsModel).where(server.UserAnalyticsModel.user_id == user_id).values(habits_max_streak=5, habits_best_streak=5))
+        await db.commit()
+
+    result = await call(client, headers, "POST", f"/api/habits/{habit['id']}/complete")
+    assert result["streak"] == 1
+    overview = await call(client, headers, "GET", "/api/analytics/overview")
+    assert overview["habits"]["max_streak"] == 3
+    assert overview["habits"]["best_streak_ever"] == 5
+
+
+async def test_writes_rebuild_a_missing_rollup_within_budget(client):
+    headers = await register(client)
+    user_id = user_id_of(headers)
+    habit = await call(client, headers, "POST", "/api/habits", json={"name": "h", "description": "d"})
+
+    async def drop_rollup():
+        async with server.async_session() as db:
+            await db.execute(delete(server.UserAnalyticsModel).where(server.UserAnalyticsModel.user_id == user_id))
+            await db.commit()
+
+    for method, path, body in (
+        ("POST", "/api/goals", {"title": "g"}),
+        ("POST", f"/api/habits/{habit['id']}/complete", None),
+        ("POST", "/api/journal", {"content": "x"}),
+        ("POST", "/api/exercises", {"exercise_type": "t", "content": {}}),
+        ("GET", "/api/analytics/overview", None),
+        ("DELETE", f"/api/habits/{habit['id']}", None),
+    ):
+        await drop_rollup()
+        await call(client, headers, method, path, json=body)
+
+    overview = await call(client, headers, "GET", "/api/analytics/overview")
+    assert overview["goals"]["total"] == 1
+    assert overview["journal"]["total_entries"] == 1
+    assert overview["habits"]["total"] == 0
+
+
+async def test_rollup_rebuild_sees_rows_flushed_in_the_callers_transaction(client, headers):
+    user_id = user_id_of(headers)
+    async with server.async_session() as db:
+        db.add(server.GoalModel(id=str(uuid.uuid4()), user_id=user_id, title="pending", milestones=[]))
+        db.add(server.JournalEntryModel(id=str(uuid.uuid4()), user_id=user_id, content="pending", gratitude=[], date=datetime.now(timezone.utc).date().isoformat()))
+        await db.flush()
+        rollup = await server.rebuild_analytics_rollup(db, user_id)
+        assert (rollup.goals_total, rollup.journal_total, rollup.journal_streak) == (1, 1, 1)
+        await db.rollback()
+
+
+@pytest.mark.parametrize("path", ["/api/dashboard", "/api/streaks"])
+async def test_aggregate_reads_use_a_single_connection(client, headers, path):
+    await call(client, headers, "POST", "/api/journal", json={"content": "x"})
+    await call(client, headers, "POST", "/api/burning-desire", json={"desire_text": "freedom", "why_text": "w", "vision_text": "v"})
+    checkouts = []
+    listener = lambda *args: checkouts.append(args)  # noqa: E731
+    event.listen(server.engine.sync_engine, "checkout", listener)
+    try:
+        body = await call(client, headers, "GET", path)
+    finally:
+        event.remove(server.engine.sync_engine, "checkout", listener)
+    assert len(checkouts) == 1
+    if path == "/api/dashboard":
+        assert body["desire_text"] == "freedom"
+        assert body["latest_journal_date"] == datetime.now(timezone.utc).date().isoformat()
+    else:
+        assert body["journal"]["current"] == 1
@@ -0,0 +1,44 @@
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_read_that_raced_a_write_is_not_cached(client, headers, monkeypatch):
+    cache_response = server.cache_response
+
+    async def write_then_cache(request, user_id, resource, body):
+        created = await client.post("/api/vision-board", headers=headers, json={"type": "text", "content": "added mid-read"})
+        assert created.status_code == 200, created.text
+        return await cache_response(request, user_id, resource, body)
+
+    monkeypatch.setattr(server, "cache_response", write_then_cache)
+    stale = await client.get("/api/vision-board", headers=headers)
+    assert stale.json() == []
+    monkeypatch.undo()
+
+    fresh = await client.get("/api/vision-board", headers=headers)
+    assert [item["content"] for item in fresh.json()] == ["added mid-read"]
+
+
+async def test_store_is_refused_after_an_evicted_invalidation():
+    cache = server.MemoryResponseCache(max_entries=1, ttl=60)
+    entry, generation = await cache.get("a")
+    assert entry is None
+    await cache.invalidate("a")
+    await cache.invalidate("b")
+    assert "a" not in cache.generations
+    assert not await cache.set("a", '"etag"', b"[]", generation)
+    assert await cache.get("a") == (None, cache.generation("a"))
+
+    _, generation = await cache.get("a")
+    assert await cache.set("a", '"etag"', b"[]", generation)
+    assert (await cache.get("a"))[0] == ('"etag"', b"[]")
+
+
+def test_memory_cache_refuses_multiple_workers(monkeypatch):
+    monkeypatch.setattr(server, "RESPONSE_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", 4)
+    with pytest.raises(RuntimeError, match="RESPONSE_CACHE_BACKEND=redis"):
+        server.build_response_cache()
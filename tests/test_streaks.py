@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from hypothesis import example, given, settings, strategies as st
+from sqlalchemy import Column, MetaData, String, Table, create_engine, delete
+from sqlalchemy.pool import StaticPool
+
+import server
+
+completions = Table("completions", MetaData(), Column("owner", String), Column("group_key", String), Column("day", String))
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    completions.create(engine)
+    yield engine
+    engine.dispose()
+
+
+def reference_streak(days, today):
+    runs = []
+    for day in sorted(set(days)):
+        if runs and day - runs[-1][-1] == timedelta(days=1):
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    if not runs:
+        return 0, 0, None
+    latest = runs[-1]
+    current = len(latest) if latest[-1] >= today - timedelta(days=1) else 0
+    return current, max(len(run) for run in runs), latest[-1].isoformat()
+
+
+def load(engine, offsets_by_habit, today):
+    with engine.begin() as conn:
+        conn.execute(delete(completions))
+        rows = [
+            {"owner": "u", "group_key": habit_id, "day": (today - timedelta(days=offset)).isoformat()}
+            for habit_id, offsets in offsets_by_habit.items()
+            for offset in offsets
+        ]
+        if rows:
+            conn.execute(completions.insert(), rows)
+
+
+offsets = st.lists(st.integers(min_value=0, max_value=40), max_size=30)
+
+
+@settings(max_examples=200, deadline=None)
+@given(offsets_by_habit=st.dictionaries(st.sampled_from(["a", "b", "c"]), offsets, max_size=3))
+@example(offsets_by_habit={"a": [0, 0, 1, 1, 2]})
+@example(offsets_by_habit={"a": [1, 2, 3, 10, 11]})
+@example(offsets_by_habit={"a": [2, 3, 4, 5], "b": [7, 9, 11]})
+@example(offsets_by_habit={"a": [0, 2, 3, 4, 5, 6]})
+def test_streak_query_matches_reference(engine, offsets_by_habit):
+    today = datetime.now(timezone.utc).date()
+    load(engine, offsets_by_habit, today)
+    offsets_by_habit = {habit_id: days for habit_id, days in offsets_by_habit.items() if days}
+    expected = {habit_id: reference_streak([today - timedelta(days=d) for d in days], today) for habit_id, days in offsets_by_habit.items()}
+    all_days = [today - timedelta(days=d) for days in offsets_by_habit.values() for d in days]
+
+    with engine.connect() as conn:
+        grouped = conn.execute(server.streak_query(completions.c.day, completions.c.owner == "u", group_col=completions.c.group_key)).all()
+        total = conn.execute(server.streak_query(completions.c.day, completions.c.owner == "u")).one()
+
+    assert {row.group_key: (row.current, row.longest, row.last_day) for row in grouped} == expected
+    assert (total.current, total.longest, total.last_day) == reference_streak(all_days, today)